@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Benchmark quadrance/spread against length/angle.
+
+Sorting walls by distance and comparing directions only needs
+quadrance and spread. This times both paths, scalar and batched.
+
+In pure Python the per-call overhead of the property and Point
+lookups outweighs sqrt/atan, so the scalar spread is not faster than
+the scalar angle; its value is that it stays exact. The speedup is in
+the batched SegmentStore path.
+
+Usage
+-----
+python benchmarks/rational_trig.py  # with pygstuff installed (pip install -e .)
+"""
+
+import math
+import timeit
+import numpy as np
+import pygstuff.geometry as geo
+
+def _segments(n:int, seed:int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    a = rng.uniform(-100, 100, (n,2))
+    b = rng.uniform(-100, 100, (n,2))
+    return [
+        geo.LineSegment([geo.Point(*p), geo.Point(*q)])
+        for p,q in zip(a.tolist(), b.tolist())
+        ]
+
+def run(n:int = 10000, repeat:int = 5) -> dict:
+    """Return best-of-`repeat` seconds for each path on `n` segments."""
+    segs = _segments(n)
+    ref = geo.LineSegment([geo.Point(0,0), geo.Point(1,0)])
+    store = geo.SegmentStore(segs)
+    cases = {
+        # Sort by distance
+        'sort by length (sqrt)':
+            lambda: sorted(segs, key=lambda l: l.length),
+        'sort by quadrance':
+            lambda: sorted(segs, key=lambda l: l.quadrance),
+        # Compare direction to a reference
+        'sin² of angle to ref (atan)':
+            lambda: [math.sin(l.angle - ref.angle)**2 for l in segs],
+        'spread to ref':
+            lambda: [l.spread(ref) for l in segs],
+        # Batched
+        'store.angles (batched)':
+            lambda: (store.invalidate(), store.angles),
+        'store.lengths (batched)':
+            lambda: (store.invalidate(), store.lengths),
+        'store.quadrances (batched)':
+            lambda: store.quadrances,
+        'store.spreads (batched)':
+            lambda: store.spreads(ref),
+        }
+    return {
+        name: min(timeit.repeat(f, number=1, repeat=repeat))
+        for name, f in cases.items()
+        }
+
+if __name__ == '__main__':
+    for name, seconds in run().items():
+        print(f"{name:30s} {seconds*1e3:8.3f} ms")
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Headless benchmark suite for the pygstuff hot paths.
+
+Runs without a display: SDL_VIDEODRIVER defaults to ``dummy``.
+
+Usage
+-----
+With pygstuff installed (pip install -e .)::
+
+    python benchmarks/suite.py                       # run everything
+    python benchmarks/suite.py -o v0.0.3.json        # save results
+    python benchmarks/suite.py -k draw --sizes 1000  # filter, resize
+    python benchmarks/suite.py --compare v0.0.3.json # compare to saved
+
+Each benchmark is a function ``f(n)`` registered with
+:func:`benchmark`. It does its setup for problem size ``n`` and
+returns the zero-argument callable to time. The reported time is the
+best of ``--repeat`` runs.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import numpy as np
+import pygstuff as pygs
+
+BENCHMARKS = {}
+SIZES = (1000, 10000, 100000)
+
+def benchmark(name:str, sizes:tuple = SIZES):
+    """Register ``f(n) -> callable`` as benchmark `name`."""
+    def register(f):
+        BENCHMARKS[name] = (f, sizes)
+        return f
+    return register
+
+# -----------
+# | Helpers |
+# -----------
+
+def _points(n:int, seed:int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    return [pygs.Point(x,y) for x,y in rng.uniform(-300, 300, (n,2)).tolist()]
+
+def _segments(n:int, seed:int = 0) -> list:
+    p = _points(2*n, seed)
+    return [pygs.LineSegment(p[i:i+2]) for i in range(0, 2*n, 2)]
+
+_window = None
+def _win():
+    """One headless 1200x600 window shared by all draw benchmarks."""
+    global _window
+    if _window is None:
+        _window = pygs.Window()
+        _window.open_window(1200, 600)
+    return _window
+
+_tmpdir = tempfile.TemporaryDirectory()
+def _data_file(rows:int, cols:int = 2) -> Path:
+    """Write (once) a tab-separated data file in the plot format."""
+    path = Path(_tmpdir.name)/f"data_{rows}x{cols}.txt"
+    if not path.exists():
+        rng = np.random.default_rng(rows)
+        data = np.column_stack((np.arange(rows), rng.normal(size=(rows, cols-1))))
+        with open(path, 'w') as f:
+            f.write('# benchmark data\n')
+            np.savetxt(f, data, delimiter='\t', fmt='%.6g')
+    return path
+
+# -------------
+# | Geometry |
+# -------------
+
+@benchmark('PointMath.add (pairs)')
+def _(n):
+    p = _points(n); q = _points(n, 1)
+    return lambda: [pygs.PointMath.add([a,b]) for a,b in zip(p,q)]
+
+@benchmark('PointMath.scale')
+def _(n):
+    p = _points(n)
+    return lambda: [pygs.PointMath.scale(a, 2.5) for a in p]
+
+@benchmark('PointMath.subtract')
+def _(n):
+    p = _points(n); q = _points(n, 1)
+    return lambda: [pygs.PointMath.subtract(a,b) for a,b in zip(p,q)]
+
+@benchmark('Line.meet')
+def _(n):
+    segs = _segments(n)
+    L = pygs.Line(slope=(1,1))
+    return lambda: [L.meet(l) for l in segs]
+
+# ---------------------------------
+# | Coordinate mapping and drawing |
+# ---------------------------------
+
+@benchmark('draw_geometry.pix_coords')
+def _(n):
+    p = _points(n); win = _win()
+    return lambda: pygs.pix_coords(p, win)
+
+@benchmark('draw_geometry.pix_coords (PointArray)')
+def _(n):
+    p = pygs.PointArray(_points(n)); win = _win()
+    return lambda: pygs.pix_coords(p, win)
+
+@benchmark('draw_geometry.draw_lineseg', sizes=(100, 1000, 10000))
+def _(n):
+    segs = _segments(n); win = _win()
+    return lambda: [pygs.draw_lineseg(l, win) for l in segs]
+
+@benchmark('draw_geometry.DrawList (linesegs)', sizes=(100, 1000, 10000))
+def _(n):
+    segs = _segments(n); win = _win()
+    def draw():
+        with pygs.DrawList(win) as dl:
+            for l in segs:
+                dl.lineseg(l)
+    return draw
+
+@benchmark('draw_geometry.draw_connect_points')
+def _(n):
+    p = _points(n); win = _win()
+    return lambda: pygs.draw_connect_points(p, win)
+
+@benchmark('draw_geometry.draw_connect_points (PointArray)')
+def _(n):
+    p = pygs.PointArray(_points(n)); win = _win()
+    return lambda: pygs.draw_connect_points(p, win)
+
+@benchmark('draw_geometry.draw_lineseg (zoomed in, no clip)', sizes=(1000, 10000))
+def _(n):
+    segs = [pygs.LineSegment([pygs.PointMath.scale(p, 20) for p in l.endpoints])
+            for l in _segments(n)]
+    win = _win()
+    return lambda: [pygs.draw_lineseg(l, win, clip=False) for l in segs]
+
+@benchmark('draw_geometry.draw_lineseg (zoomed in, clip)', sizes=(1000, 10000))
+def _(n):
+    segs = [pygs.LineSegment([pygs.PointMath.scale(p, 20) for p in l.endpoints])
+            for l in _segments(n)]
+    win = _win()
+    return lambda: [pygs.draw_lineseg(l, win, clip=True) for l in segs]
+
+@benchmark('draw_geometry.StaticLayer (cached walls)', sizes=(100, 1000, 10000))
+def _(n):
+    layer = pygs.StaticLayer(_win(), background=(0,0,0))
+    layer.linesegs(_segments(n))
+    layer.flush()
+    return layer.flush
+
+def _rays(n:int) -> np.ndarray:
+    """n long line segments (S×2×2), like rays crossing the window."""
+    rng = np.random.default_rng(0)
+    A = rng.uniform(-580, 580, (n,2))*[1, 0.5]
+    return np.stack((A, A + rng.uniform(-300, 300, (n,2))), axis=1)
+
+@benchmark('draw_geometry.draw_linesegs (rays, pygame)', sizes=(1000, 10000, 50000))
+def _(n):
+    segs = _rays(n); win = _win()
+    return lambda: pygs.draw_linesegs(segs, win)
+
+@benchmark('draw_geometry.draw_linesegs (rays, numpy)', sizes=(1000, 10000, 50000))
+def _(n):
+    segs = _rays(n); win = _win()
+    return lambda: pygs.draw_linesegs(segs, win, backend='numpy')
+
+def _trace(n:int) -> np.ndarray:
+    """n noisy samples across the width of the window."""
+    x = np.linspace(-599, 599, n)
+    y = 200*np.sin(x/7) + np.random.default_rng(0).normal(0, 30, n)
+    return np.column_stack((x, y))
+
+@benchmark('draw_geometry.draw_connect_points (trace, no decimate)', sizes=(10000, 100000, 1000000))
+def _(n):
+    xy = _trace(n); win = _win()
+    return lambda: pygs.draw_connect_points(xy, win, decimate=False)
+
+@benchmark('draw_geometry.draw_connect_points (trace, decimate)', sizes=(10000, 100000, 1000000))
+def _(n):
+    xy = _trace(n); win = _win()
+    return lambda: pygs.draw_connect_points(xy, win)
+
+# ------------
+# | Raytrace |
+# ------------
+
+def _walls(n:int) -> list:
+    rng = np.random.default_rng(n)
+    a = rng.uniform(-600, 600, (n,2))
+    b = a + rng.uniform(-20, 20, (n,2))
+    return [pygs.LineSegment([pygs.Point(*p), pygs.Point(*q)])
+            for p,q in zip(a.tolist(), b.tolist())]
+
+@benchmark('raytrace.Tracer (1000 rays, 3 bounces, brute force)', sizes=(100, 1000, 10000))
+def _(n):
+    tracer = pygs.raytrace.Tracer(_walls(n), bounces=3, grid=False)
+    return lambda: tracer.trace(pygs.Point(0,0), 1000)
+
+@benchmark('raytrace.Tracer (1000 rays, 3 bounces, grid)', sizes=(100, 1000, 10000))
+def _(n):
+    tracer = pygs.raytrace.Tracer(_walls(n), bounces=3, grid=True)
+    return lambda: tracer.trace(pygs.Point(0,0), 1000)
+
+# ----------------
+# | Plot loading |
+# ----------------
+
+@benchmark('plot.get_data', sizes=(10000, 100000, 1000000))
+def _(n):
+    path = _data_file(n)
+    return lambda: pygs.plot.get_data(path, col=1)
+
+@benchmark('plot x and y (strings, per column)', sizes=(10000, 100000, 1000000))
+def _(n):
+    path = _data_file(n)
+    def load():
+        x = [float(s) for s in pygs.plot._strings_from_data_columns(path)[0]]
+        y = [float(s) for s in pygs.plot._strings_from_data_columns(path)[1]]
+        return x, y
+    return load
+
+@benchmark('plot x and y (get_data twice)', sizes=(10000, 100000, 1000000))
+def _(n):
+    path = _data_file(n)
+    return lambda: (pygs.plot.get_data(path, 0), pygs.plot.get_data(path, 1))
+
+@benchmark('plot x and y (load_columns)', sizes=(10000, 100000, 1000000))
+def _(n):
+    path = _data_file(n)
+    return lambda: pygs.plot.load_columns(path, [0, 1])
+
+@benchmark('plot x and y (load_columns, float32)', sizes=(10000, 100000, 1000000))
+def _(n):
+    path = _data_file(n)
+    return lambda: pygs.plot.load_columns(path, [0, 1], dtype=np.float32)
+
+@benchmark('plot x and y (load_columns, cache hit)', sizes=(10000, 100000, 1000000))
+def _(n):
+    path = _data_file(n)
+    pygs.plot.load_columns(path, [0, 1], cache=True) # make the cache
+    def load():
+        x, y = pygs.plot.load_columns(path, [0, 1], cache=True)
+        return float(x.max()), float(y.max()) # touch the data
+    return load
+
+@benchmark('plot.Follower (poll 100 new lines)', sizes=(10000, 100000, 1000000))
+def _(n):
+    import shutil
+    path = Path(_tmpdir.name)/f"growing_{n}.txt"
+    shutil.copyfile(_data_file(n), path)
+    follower = pygs.plot.Follower(path, cols=[0, 1])
+    follower.poll()
+    lines = ''.join(f"{i}\t0.5\n" for i in range(100))
+    def poll():
+        with open(path, 'a') as f:
+            f.write(lines)
+        return follower.poll()
+    return poll
+
+@benchmark('plot.get_data (re-read after 100 new lines)', sizes=(10000, 100000, 1000000))
+def _(n):
+    import shutil
+    path = Path(_tmpdir.name)/f"growing_{n}.txt"
+    shutil.copyfile(_data_file(n), path)
+    lines = ''.join(f"{i}\t0.5\n" for i in range(100))
+    def reread():
+        with open(path, 'a') as f:
+            f.write(lines)
+        return pygs.plot.get_data(path, 1)
+    return reread
+
+@benchmark('plot.scale_data_to_fit (strip chart frame)', sizes=(1000, 10000, 100000))
+def _(n):
+    data = np.random.default_rng(0).normal(size=n).tolist()
+    def frame():
+        data.pop(0); data.append(0.5)
+        return pygs.plot.scale_data_to_fit(data, 500)
+    return frame
+
+@benchmark('plot.RingSeries (strip chart frame)', sizes=(1000, 10000, 100000))
+def _(n):
+    series = pygs.plot.RingSeries(n)
+    series.extend(np.random.default_rng(0).normal(size=n).tolist())
+    out = np.empty(n)
+    def frame():
+        series.append(0.5)
+        return series.scaled(500, out=out)
+    return frame
+
+# ----------
+# | Runner |
+# ----------
+
+def run(names:list, sizes:tuple = None, repeat:int = 3) -> dict:
+    """Run the named benchmarks. Return {name: {n: seconds}}."""
+    results = {}
+    for name in names:
+        f, default_sizes = BENCHMARKS[name]
+        results[name] = {}
+        for n in (sizes or default_sizes):
+            call = f(n)
+            best = float('inf')
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                call()
+                best = min(best, time.perf_counter() - t0)
+            results[name][str(n)] = best
+            print(f"{name:56s} n={n:<9d} {best*1e3:10.3f} ms", flush=True)
+    return results
+
+def _meta() -> dict:
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, cwd=Path(__file__).parent
+            ).stdout.strip()
+    except OSError:
+        commit = ''
+    import pygame
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pygame': pygame.version.ver,
+        'machine': platform.machine(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+
+def compare(results:dict, baseline:dict) -> None:
+    """Print the speedup of `results` over a saved `baseline`."""
+    print(f"\n{'benchmark':56s} {'n':>9s} {'before':>10s} {'after':>10s} {'speedup':>8s}")
+    for name, by_n in results.items():
+        for n, after in by_n.items():
+            before = baseline.get(name, {}).get(n)
+            if before is None:
+                continue
+            print(f"{name:56s} {n:>9s} {before*1e3:8.3f}ms {after*1e3:8.3f}ms {before/after:7.2f}x")
+
+def main(argv:list = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-k', dest='filter', default='',
+        help="only run benchmarks whose name contains this text")
+    parser.add_argument('--sizes', type=int, nargs='+',
+        help="problem sizes (default: per benchmark)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('-o', '--output', type=Path,
+        help="save results to this JSON file")
+    parser.add_argument('--compare', type=Path,
+        help="JSON file from an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    results = run(names, args.sizes, args.repeat)
+    if args.output:
+        args.output.write_text(json.dumps(
+            {'meta': _meta(), 'results': results}, indent=2
+            ))
+    if args.compare:
+        compare(results, json.loads(args.compare.read_text())['results'])
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,10 @@
 # -*- coding: utf-8 -*-
 
 import pygame
+from collections import deque
+import contextlib
+import math
+import time
 
 class Clock(object):
     '''The game clock.
@@ -26,15 +30,38 @@ class Clock(object):
     Example: loop
     -------
     >>> clock.tick()
+
+    Usage: frame timing
+    -----
+    The clock remembers the last `history` frame times. Ask it where
+    the frame budget goes with stats(). Turn on `timing` to also time
+    named phases of the loop with phase().
+
+    Example: frame timing
+    -------
+    >>> clock = pygs.Clock(framerate=100, timing=True)
+    >>> for _ in range(5):
+    ...     with clock.phase('update'):
+    ...         pass
+    ...     with clock.phase('draw'):
+    ...         pass
+    ...     clock.tick()
+    >>> stats = clock.stats()
+    >>> sorted(stats)
+    ['busy', 'fps', 'frame', 'phases']
+    >>> sorted(stats['frame'])
+    ['mean', 'p50', 'p95', 'p99']
+    >>> sorted(stats['phases'])
+    ['draw', 'update']
     '''
-    def __init__(self, framerate=50):
+    def __init__(self, framerate=50, history=120, timing=False):
         '''Clock configuration.
 
         - stores framerate as private attribute _framerate
         - calls pygame.time.Clock() and stores as private attribute _clock
-        
+
         See method tick().
-        
+
         Parameter
         ---------
         framerate:
@@ -44,14 +71,112 @@ class Clock(object):
             - update is throttled at the framerate:
                 - game may run slower than framerate
                 - but game cannot run faster than framerate
+        history:
+            - number of frames kept for stats()
+            - default is 120 (a few seconds of frames)
+        timing:
+            - if True, phase() times named phases of the loop
+            - if False (default), phase() does nothing and costs
+              almost nothing
         '''
         self._framerate = framerate
         self._clock = pygame.time.Clock()
+        self.timing = timing
+        self._frame_times = deque(maxlen=history) # ms per frame
+        self._busy_times = deque(maxlen=history)  # ms per frame, minus the wait
+        self._phase_times = {}                    # name -> deque of ms
+        self._history = history
+        self.frame_time = 0
     def tick(self):
         '''Tick the game clock at rate _framerate.
+
+        The milliseconds since the previous tick are recorded for
+        stats() and kept in attribute frame_time.
+        '''
+        self.frame_time = self._clock.tick(self._framerate)
+        self._frame_times.append(self.frame_time)
+        self._busy_times.append(self._clock.get_rawtime())
+    def phase(self, name):
+        '''Return a context manager that times phase `name` of the loop.
+
+        Example
+        -------
+        >>> import pygstuff as pygs
+        >>> clock = pygs.Clock(timing=True)
+        >>> 'events' in clock.stats()['phases']
+        False
+        >>> import time
+        >>> with clock.phase('events'):
+        ...     time.sleep(0.01)
+        >>> stats = clock.stats()
+        >>> 'events' in stats['phases']
+        True
+        >>> stats['phases']['events']['mean'] >= 10 # ms
+        True
+
+        When timing is off, the phase is not recorded:
+        >>> clock.timing = False
+        >>> with clock.phase('draw'):
+        ...     pass
+        >>> 'draw' in clock.stats()['phases']
+        False
+        '''
+        if not self.timing:
+            return _no_timer
+        if name not in self._phase_times:
+            self._phase_times[name] = deque(maxlen=self._history)
+        return _PhaseTimer(self._phase_times[name])
+    def stats(self):
+        '''Return frame timing statistics as a dict.
+
+        - 'fps': frames per second, averaged over the history
+        - 'frame': mean, p50, p95, p99 of the frame time in ms
+        - 'busy': same, but without the time tick() waited to hold
+          the framerate (the part of the frame budget actually used)
+        - 'phases': phase name -> mean, p50, p95, p99 in ms
         '''
-        self._clock.tick(self._framerate)
+        frame = _summary(self._frame_times)
+        return {
+            'fps': 1000/frame['mean'] if frame['mean'] else 0.0,
+            'frame': frame,
+            'busy': _summary(self._busy_times),
+            'phases': {
+                name: _summary(times)
+                for name, times in self._phase_times.items()
+                },
+            }
+
+class _PhaseTimer(object):
+    '''Context manager that appends its elapsed ms to a deque.'''
+    __slots__ = ('_times', '_start')
+    def __init__(self, times):
+        self._times = times
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+    def __exit__(self, *exc):
+        self._times.append((time.perf_counter() - self._start)*1000)
+        return False
+
+_no_timer = contextlib.nullcontext()
+
+def _percentile(ordered, p):
+    '''Nearest-rank percentile of an already sorted list.'''
+    k = max(0, min(len(ordered) - 1, math.ceil(p/100*len(ordered)) - 1))
+    return ordered[k]
+
+def _summary(times):
+    '''Return mean, p50, p95, p99 of a collection of ms values.'''
+    if len(times) == 0:
+        return {'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+    ordered = sorted(times)
+    return {
+        'mean': sum(ordered)/len(ordered),
+        'p50': _percentile(ordered, 50),
+        'p95': _percentile(ordered, 95),
+        'p99': _percentile(ordered, 99),
+        }
+
 if __name__ == '__main__':
     import doctest
     print(doctest.testmod())
-
@@ -29,6 +29,8 @@ scale
      inconvenient to be stuck with one drawing unit equal to one
      pixel.
 """
+from collections import namedtuple
+import numpy as np
 import pygame
 import pygstuff as pygs
 
@@ -36,15 +38,215 @@ import pygstuff as pygs
 # | Map points to pixels |
 # ------------------------
 
-# (Lazy me is using globals)
-# pcsys is the PixelCoordinateSystem
-# pcsys = {'scale':32, 'origin':pygs.Point(100,100)}
-pcsys = {'scale':1, 'origin':pygs.Point(0,0)}
+class PixelCoordinateSystem():
+    """Map drawing units to window pixels and back.
+
+    The mapping is the one described in the module docstring: scale
+    the point, round to the nearest pixel, and shift so that `origin`
+    (defined relative to the window center, backwards y) is the
+    geometry origin.
+
+    The pixel offset depends on the scale, the origin, and the window
+    size. It is computed once and cached. Changing ``scale`` or
+    ``origin``, or mapping for a window of a different size,
+    recomputes it. The ``version`` attribute counts the changes, so
+    anything that caches pixels can tell when they go stale.
+
+    Example
+    -------
+    >>> import pygstuff as pygs
+    >>> win = pygs.Window()
+    >>> win.open_window(1200, 600)
+    >>> pc = PixelCoordinateSystem(scale=1, origin=pygs.Point(0,0))
+
+    World to pixel, same as :func:`pix_coord`:
+    >>> pc.to_pixel(pygs.Point(50,100), win)
+    Point(x=650, y=200)
+
+    Pixel to world, e.g., to find what the mouse is pointing at:
+    >>> pc.to_world((650,200), win)
+    Point(x=50.0, y=100.0)
+
+    Zoom out. Now one pixel is two drawing units:
+    >>> pc.scale = 2
+    >>> pc.to_pixel(pygs.Point(50,100), win)
+    Point(x=625, y=250)
+    >>> pc.version
+    1
+
+    It is accepted everywhere a pcsys dict is:
+    >>> pix_coord(pygs.Point(50,100), win, pc)
+    Point(x=625, y=250)
+
+    The old dict-style access still works:
+    >>> pc['scale']
+    2
+    >>> pc['origin'] = pygs.Point(100,0)
+    >>> pc.origin
+    Point(x=100, y=0)
+
+    Parameters
+    ----------
+    scale
+        At scale N, one pixel is N drawing units.
+    origin
+        Coordinate system origin relative to the center of the window,
+        in pixels (backwards y).
+    """
+
+    def __init__(self, scale:float = 1, origin:pygs.Point = pygs.Point(0,0)):
+        self._scale = scale
+        self._origin = origin
+        self.version = 0
+        self._cache_key = None
+        self._offset = None
+        self._viewport = None
+
+    @classmethod
+    def from_dict(cls, pcsys:dict) -> object:
+        """Alternative definition from a ``{'scale':..., 'origin':...}`` dict."""
+        return cls(pcsys['scale'], pcsys['origin'])
+
+    @property
+    def scale(self) -> float:
+        return self._scale
+
+    @scale.setter
+    def scale(self, scale:float) -> None:
+        self._scale = scale
+        self._changed()
+
+    @property
+    def origin(self) -> pygs.Point:
+        return self._origin
+
+    @origin.setter
+    def origin(self, origin:pygs.Point) -> None:
+        self._origin = origin
+        self._changed()
+
+    def _changed(self) -> None:
+        self.version += 1
+        self._cache_key = None
+        self._viewport = None
+
+    # dict-style access, for code written against the old pcsys dict
+    def __getitem__(self, key:str):
+        if key not in ('scale', 'origin'):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key:str, value) -> None:
+        if key not in ('scale', 'origin'):
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def offset(self, window:pygs.Window) -> tuple:
+        """Return the pixel (x,y) of the geometry origin in this window."""
+        key = (window.width, window.height)
+        if self._cache_key != key:
+            # The origin is defined relative to the window center.
+            self._offset = (
+                round(window.width/2) + self._origin.x,
+                round(window.height/2) + self._origin.y
+                )
+            self._cache_key = key
+            self._viewport = None
+        return self._offset
+
+    def viewport(self, window:pygs.Window) -> tuple:
+        """Return the part of the world visible in the window.
+
+        The rectangle is in drawing units, (xmin, ymin, xmax, ymax),
+        and includes a two pixel margin so antialiased edges are not
+        lost.
+
+        Example
+        -------
+        >>> import pygstuff as pygs
+        >>> win = pygs.Window()
+        >>> win.open_window(1200, 600)
+        >>> PixelCoordinateSystem(scale=2).viewport(win)
+        (-1204.0, -602.0, 1202.0, 604.0)
+        """
+        self.offset(window) # drops the cached viewport if the window changed
+        if self._viewport is None:
+            left, top = self.to_world((-2, -2), window)
+            right, bottom = self.to_world((window.width + 1, window.height + 1), window)
+            self._viewport = (
+                min(left, right), min(top, bottom),
+                max(left, right), max(top, bottom)
+                )
+        return self._viewport
+
+    def matrix(self, window:pygs.Window) -> np.ndarray:
+        """Return the 3×3 affine transform from world to pixel coordinates.
+
+        This is the transform before rounding to whole pixels.
+        """
+        ox, oy = self.offset(window)
+        s = 1/self._scale
+        return np.array([[s, 0, ox], [0, -s, oy], [0, 0, 1]], dtype=np.float64)
+
+    def to_pixel(self, point:pygs.Point, window:pygs.Window) -> pygs.Point:
+        """Return the pixel for one point. See :func:`pix_coord`."""
+        ox, oy = self.offset(window)
+        # pixels must be integers, so round to nearest integer
+        return pygs.Point(
+            ox + round(point.x/self._scale),
+            oy - round(point.y/self._scale)
+            )
+
+    def to_pixels(self, points, window:pygs.Window) -> np.ndarray:
+        """Return the pixels for an array of points. See :func:`pix_coords_array`."""
+        xy = pygs.geometry._as_xy(points).reshape(-1, 2)
+        ox, oy = self.offset(window)
+        # np.rint rounds halves to even, like Python's round
+        pixels = np.rint(xy/self._scale)
+        pixels[:,0] += ox
+        np.subtract(oy, pixels[:,1], out=pixels[:,1])
+        if float(ox).is_integer() and float(oy).is_integer():
+            return pixels.astype(np.int64)
+        return pixels # a fractional origin gives fractional pixels, like pix_coord
+
+    def to_world(self, pixel:tuple, window:pygs.Window) -> pygs.Point:
+        """Return the point in drawing units at this pixel (inverse mapping).
+
+        The inverse of :meth:`to_pixel` up to the rounding: the result
+        is the point at the exact pixel location.
+        """
+        ox, oy = self.offset(window)
+        return pygs.Point(
+            float((pixel[0] - ox)*self._scale),
+            float((oy - pixel[1])*self._scale)
+            )
+
+    def to_worlds(self, pixels, window:pygs.Window) -> pygs.PointArray:
+        """Return the points in drawing units at an array of pixels."""
+        xy = np.asarray(pixels, dtype=np.float64).reshape(-1, 2)
+        ox, oy = self.offset(window)
+        return pygs.PointArray(np.column_stack((
+            (xy[:,0] - ox)*self._scale,
+            (oy - xy[:,1])*self._scale
+            )))
+
+    def __repr__(self):
+        return f"PixelCoordinateSystem(scale={self._scale!r}, origin={self._origin!r})"
+
+def _as_pcsys(pcsys) -> PixelCoordinateSystem:
+    """Accept a PixelCoordinateSystem or an old-style pcsys dict."""
+    if isinstance(pcsys, PixelCoordinateSystem):
+        return pcsys
+    return PixelCoordinateSystem.from_dict(pcsys)
+
+# pcsys is the default PixelCoordinateSystem.
+# Set pcsys.scale and pcsys.origin to zoom and pan.
+pcsys = PixelCoordinateSystem(scale=1, origin=pygs.Point(0,0))
 
 def pix_coord(
     point:pygs.Point,
     window:pygs.Window,
-    pcsys:dict = pcsys
+    pcsys:PixelCoordinateSystem = pcsys
     ) -> pygs.Point:
     """Return pixel coordinates for a point.
 
@@ -63,8 +265,9 @@ def pix_coord(
         A pygame window, as defined by pygs.
 
     pcsys
-        Pixel coordinate system. I set this up as a global dict in the
-        application, maybe I'll think of something better later.
+        Pixel coordinate system: a :class:`PixelCoordinateSystem`
+        (or, the old way, a dict with keys 'scale' and 'origin').
+        Default is the module-level ``pcsys``.
 
         scale
             Coordinate system scale.
@@ -113,29 +316,16 @@ def pix_coord(
     Point(x=601, y=300)
     """
 
-    # The pcsys origin is defined relative to the window center.
-    window_center = pygs.Point(round(window.width/2), round(window.height/2))
-
-    # Map geometry origin to pixel origin.
-    origin = pygs.PointMath.add([window_center, pcsys['origin']])
-
-    # Calculate pixel x,y:
-    # - shift relative to origin
-    # - scale
-    # - pixels must be integers, so round to nearest integer
-    x = origin.x + round(point.x/pcsys['scale'])
-    y = origin.y - round(point.y/pcsys['scale'])
-
     # TODO: decide if I care whether the pixel is visible...
     # like how much computational effort is wasted drawing as if the
     # screen is infinitely big...
 
-    return pygs.Point(x,y)
+    return _as_pcsys(pcsys).to_pixel(point, window)
 
 def pix_coords(
         points:list,
         window:pygs.Window,
-        pcsys:dict = pcsys
+        pcsys:PixelCoordinateSystem = pcsys
         ) -> list:
     """Return a list of pixel coordinates for a list of points.
 
@@ -190,38 +380,1020 @@ def pix_coords(
     >>> l = pygs.LineSegment.from_length(2)
     >>> pix_coords(l.endpoints, win, pix_coord_sys)
     [Point(x=599, y=300), Point(x=601, y=300)]
+
+    A PointArray or an N×2 ``numpy.ndarray`` takes the vectorized
+    path and returns an array. See :func:`pix_coords_array`.
+    >>> pix_coords(pygs.PointArray([a,b,c]), win, pix_coord_sys).tolist()
+    [[595, 300], [605, 300], [605, 290]]
+    """
+    pcsys = _as_pcsys(pcsys)
+    if isinstance(points, (pygs.PointArray, np.ndarray)):
+        return pcsys.to_pixels(points, window)
+    return [pcsys.to_pixel(point, window) for point in points]
+
+def pix_coords_array(
+        points,
+        window:pygs.Window,
+        pcsys:PixelCoordinateSystem = pcsys
+        ) -> np.ndarray:
+    """Return pixel coordinates for an array of points, vectorized.
+
+    Same mapping and rounding as :func:`pix_coord`, done for all the
+    points at once: the window center and origin are computed once and
+    the points are shifted, scaled and rounded with NumPy.
+
+    Parameters
+    ----------
+    points
+        A PointArray, an N×2 ``numpy.ndarray``, or a list of points.
+    window, pcsys
+        See :func:`pix_coord`.
+
+    Return
+    ------
+    numpy.ndarray
+        N×2 array of integer pixel coordinates. Pass it straight to
+        pygame draw functions.
+
+    Example
+    -------
+    >>> import pygstuff as pygs
+    >>> win = pygs.Window()
+    >>> win.open_window(1200, 600)
+    >>> pix_coord_sys = {'scale':1, 'origin':pygs.Point(0,0)}
+    >>> pix_coords_array([(0,0), (50,100), (0.51,0.5)], win, pix_coord_sys).tolist()
+    [[600, 300], [650, 200], [601, 300]]
+
+    Rounding matches :func:`pix_coord` (Python's round, which rounds
+    halves to even):
+    >>> pts = [pygs.Point(x/4, -x/4) for x in range(-9, 10)]
+    >>> slow = pix_coords(pts, win, pix_coord_sys)
+    >>> fast = pix_coords_array(pts, win, pix_coord_sys)
+    >>> fast.tolist() == [list(p) for p in slow]
+    True
     """
-    return [pix_coord(point, window, pcsys) for point in points]
+    return _as_pcsys(pcsys).to_pixels(points, window)
+
+# ------------------------------
+# | Skip what is not on screen |
+# ------------------------------
+
+class DrawStats():
+    """Count the line segments the draw functions culled and clipped.
+
+    segments
+        Line segments handed to a draw function with ``clip=True``.
+    culled
+        Line segments dropped because they were entirely off screen.
+    clipped
+        Line segments shortened to the part that is on screen.
+
+    Call :meth:`reset` once per frame to get per-frame counts.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Set all counters to zero."""
+        self.segments = 0
+        self.culled = 0
+        self.clipped = 0
+
+    def __repr__(self):
+        return (f"DrawStats(segments={self.segments}, culled={self.culled}, "
+                f"clipped={self.clipped})")
+
+# draw_stats counts for all the draw functions.
+draw_stats = DrawStats()
+
+def _drawn(window, rect) -> None:
+    """Tell the window's dirty-rectangle tracker (if on) what was drawn."""
+    if getattr(window, 'dirty', None) is not None:
+        window.dirty.add(rect)
+
+# ----------------
+# | Draw shapes |
+# ----------------
 
 def draw_lineseg(
         l:pygs.LineSegment,
         window:pygs.Window,
-        pcsys:dict = pcsys, # PixelCoordinateSystem
-        rgb:tuple=(255,255,255)
+        pcsys:PixelCoordinateSystem = pcsys,
+        rgb:tuple=(255,255,255),
+        clip:bool = True
         ) -> None:
     """Draw a line segment in the window.
 
+    If `clip` is True, a line segment that is entirely off screen is
+    not drawn, and a line segment that is partly off screen is clipped
+    to the window. Clipping is decided in drawing units; the clipped
+    ends are then placed on the same pixel line the unclipped segment
+    would have drawn, so the visible pixels match the unclipped
+    drawing to within one level of antialiasing. See ``draw_stats``.
+
+    Example
+    -------
+    >>> import pygstuff as pygs
+    >>> win = pygs.Window()
+    >>> win.open_window(1200, 600)
+    >>> draw_stats.reset()
+    >>> draw_lineseg(pygs.LineSegment.from_length(10), win)
+    >>> draw_lineseg(pygs.LineSegment.from_length(10, pygs.Point(5000,0)), win)
+    >>> draw_lineseg(pygs.LineSegment.from_length(5000), win)
+    >>> draw_stats
+    DrawStats(segments=3, culled=1, clipped=1)
     """
-    pygame.draw.aalines(
+    if clip:
+        pcsys = _as_pcsys(pcsys)
+        draw_stats.segments += 1
+        a, b = l.endpoints
+        visible = pygs.geometry._clip_t(a, b, pcsys.viewport(window))
+        if visible is None:
+            draw_stats.culled += 1
+            return
+        t0, t1 = visible
+        if t0 > 0 or t1 < 1:
+            draw_stats.clipped += 1
+            P = pcsys.to_pixel(a, window); Q = pcsys.to_pixel(b, window)
+            dx = Q.x - P.x; dy = Q.y - P.y
+            _drawn(window, pygame.draw.aalines(
+                window.surface,
+                rgb,
+                False,
+                [(P.x + t0*dx, P.y + t0*dy), (P.x + t1*dx, P.y + t1*dy)]
+                ))
+            return
+    _drawn(window, pygame.draw.aalines(
         window.surface,
         rgb,
         False, # if True, connect first and last points
         pix_coords(l.endpoints, window, pcsys)
-        )
+        ))
 
 def draw_connect_points(
         points:list,
         window:pygs.Window,
-        pcsys:dict = pcsys, # PixelCoordinateSystem
-        rgb:tuple=(255,255,255)
+        pcsys:PixelCoordinateSystem = pcsys,
+        rgb:tuple=(255,255,255),
+        clip:bool = True,
+        decimate:bool = True
         ) -> None:
     """Draw line segments connecting the list of points.
 
+    `points` can also be a PointArray or an N×2 ``numpy.ndarray``.
+    Then the points are mapped to pixels in one vectorized call.
+
+    If `clip` is True, the line segments are clipped to the window (in
+    drawing units, before drawing). Off-screen line segments are
+    dropped, and where the polyline leaves the window and comes back
+    it is drawn as separate pieces. As in :func:`draw_lineseg`, the
+    visible pixels match the unclipped drawing. See ``draw_stats``.
+
+    If `decimate` is True, a polyline with many more points than the
+    window has pixel columns is thinned with :func:`decimate_pixels`
+    after mapping to pixels. A million-sample trace then costs a few
+    thousand points in ``aalines`` instead of a million.
+
+    Example
+    -------
+    >>> import pygstuff as pygs
+    >>> win = pygs.Window()
+    >>> win.open_window(1200, 600)
+    >>> draw_stats.reset()
+
+    A zig-zag that goes off the right side of the window and back:
+    >>> pts = [pygs.Point(0,0), pygs.Point(500,0), pygs.Point(700,50),
+    ...        pygs.Point(900,100), pygs.Point(500,100)]
+    >>> draw_connect_points(pts, win)
+    >>> draw_stats
+    DrawStats(segments=4, culled=1, clipped=2)
+
+    A long trace is decimated to a few points per pixel column:
+    >>> import numpy as np
+    >>> x = np.linspace(-500, 500, 100000)
+    >>> trace = np.column_stack((x, 100*np.sin(x/20)))
+    >>> draw_connect_points(trace, win, clip=False)
+    >>> len(decimate_pixels(pygs.pcsys.to_pixels(trace, win))) < 4*win.width
+    True
+
+    A trace that goes off the top and bottom of the window is drawn
+    in clipped pieces. Decimated, it still lights exactly the same
+    pixels:
+    >>> x = np.linspace(-599, 599, 20000)
+    >>> y = 400*np.sin(x/30) + np.random.default_rng(0).normal(0, 30, x.size)
+    >>> drawn = []
+    >>> for decimate in (False, True):
+    ...     _ = win.surface.fill((0,0,0))
+    ...     draw_connect_points(np.column_stack((x, y)), win, decimate=decimate)
+    ...     drawn.append(pygame.surfarray.array3d(win.surface))
+    >>> bool((drawn[0] == drawn[1]).all())
+    True
+
+    Even if every sample lands on the same pixel:
+    >>> dot = np.column_stack((np.linspace(0, 0.3, 10000), np.zeros(10000)))
+    >>> draw_connect_points(dot, win)
+    >>> draw_connect_points(dot, win, clip=False)
     """
-    pygame.draw.aalines(
+    if clip and len(points) >= 2:
+        _draw_clipped_polyline(points, window, _as_pcsys(pcsys), rgb, decimate)
+        return
+    if decimate and len(points) > _LOD_POINTS_PER_COLUMN*window.width:
+        pixels = decimate_pixels(_as_pcsys(pcsys).to_pixels(points, window))
+        if len(pixels) < 2:
+            return
+    else:
+        pixels = pix_coords(points, window, pcsys)
+    _drawn(window, pygame.draw.aalines(
         window.surface,
         rgb,
         False, # if True, connect first and last points
-        pix_coords(points, window, pcsys)
+        pixels
+        ))
+
+def _draw_clipped_polyline(points, window, pcsys, rgb, decimate:bool = True) -> int:
+    """Clip a polyline to the window and draw the visible pieces.
+
+    Return the number of draw calls: 0 if it is all off screen.
+    """
+    xy = pygs.geometry._as_xy(points).reshape(-1, 2)
+    c = pygs.clip_arrays(xy[:-1], xy[1:], pcsys.viewport(window))
+    cut_start = c.t0 > 0
+    cut_end = c.t1 < 1
+    draw_stats.segments += len(c.keep)
+    draw_stats.culled += int(np.count_nonzero(~c.keep))
+    draw_stats.clipped += int(np.count_nonzero(c.keep & (cut_start | cut_end)))
+    many = decimate and len(xy) > _LOD_POINTS_PER_COLUMN*window.width
+    if c.keep.all() and not cut_start.any() and not cut_end.any():
+        # All on screen: one draw call
+        P = pcsys.to_pixels(xy, window)
+        if many:
+            P = decimate_pixels(P)
+            if len(P) < 2:
+                return 0
+        _drawn(window, pygame.draw.aalines(window.surface, rgb, False, P))
+        return 1
+    # A new piece starts wherever the previous segment is not drawn
+    # or one of them was clipped at the joint.
+    new_piece = c.keep.copy()
+    new_piece[1:] &= ~c.keep[:-1] | cut_end[:-1] | cut_start[1:]
+    # Place the clipped ends on the pixel line between the rounded
+    # pixels of the original points.
+    P = pcsys.to_pixels(xy, window)
+    k = np.flatnonzero(c.keep)
+    d = P[k+1] - P[k]
+    starts = P[k] + c.t0[k,np.newaxis]*d
+    ends = P[k] + c.t1[k,np.newaxis]*d
+    bounds = list(np.flatnonzero(new_piece[c.keep])) + [len(ends)]
+    calls = 0
+    for b, e in zip(bounds[:-1], bounds[1:]):
+        piece = np.vstack((starts[b:b+1], ends[b:e]))
+        if many and len(piece) > 3:
+            # The clipped ends are fractional pixels: rounding them
+            # into the columns of the points next to them would change
+            # the segments to them. Keep them exact and decimate the
+            # points between them.
+            piece = np.vstack((piece[:1], decimate_pixels(piece[1:-1]), piece[-1:]))
+        _drawn(window, pygame.draw.aalines(
+            window.surface,
+            rgb,
+            False,
+            piece
+            ))
+        calls += 1
+    return calls
+
+# -------------------
+# | Level of detail |
+# -------------------
+
+# Polylines with more points than this per pixel column are decimated.
+_LOD_POINTS_PER_COLUMN = 4
+
+def decimate_pixels(pixels, tolerance:float = 0) -> np.ndarray:
+    """Drop polyline points that do not change the drawing.
+
+    `pixels` is an N×2 array of a polyline already mapped to pixels,
+    e.g. from :meth:`PixelCoordinateSystem.to_pixels`.
+
+    - Repeated consecutive pixels are dropped.
+    - If x never decreases (or never increases), as for a trace of
+      samples, only the first, last, lowest and highest point of
+      each pixel column are kept, in their original order. The line
+      still spans the same pixels in each column. At most 4 points
+      per column.
+
+    The drawing is the same as drawing every point. Other polylines
+    (not monotonic in x) only lose their repeated pixels: dropping
+    the middle of a straight run changes the antialiasing where the
+    run's segments join. With `tolerance` > 0, they are instead
+    simplified with the Ramer–Douglas–Peucker algorithm: far fewer
+    points, but the drawing is only the same to within `tolerance`
+    pixels.
+
+    The first and last point are always kept, so a polyline of two
+    or more points stays one that ``pygame.draw.aalines`` can draw.
+
+    Example
+    -------
+    A trace of 10000 samples across 100 pixel columns:
+    >>> x = np.repeat(np.arange(100), 100)
+    >>> y = (np.arange(10000)*7919) % 50
+    >>> P = np.column_stack((x, y))
+    >>> Q = decimate_pixels(P)
+    >>> len(Q) <= 4*100
+    True
+
+    Same pixel columns, and the same y range in each column:
+    >>> [(int(q[:,1].min()), int(q[:,1].max())) for q in (P[x == 5], Q[Q[:,0] == 5])]
+    [(0, 49), (0, 49)]
+
+    A circle is not monotonic in x:
+    >>> a = np.linspace(0, 2*np.pi, 100000)
+    >>> circle = np.rint(np.column_stack((200*np.cos(a), 200*np.sin(a))))
+    >>> len(decimate_pixels(circle)) < 2000
+    True
+    >>> len(decimate_pixels(circle, tolerance=1)) < 200
+    True
+
+    Samples that all land on one pixel still make a line of two
+    points (pygame needs at least two):
+    >>> decimate_pixels(np.zeros((10000, 2), dtype=int)).tolist()
+    [[0, 0], [0, 0]]
+
+    Parameters
+    ----------
+    pixels
+        N×2 array of pixel coordinates.
+    tolerance
+        0 (default) to keep the drawing the same. Otherwise the
+        largest distance in pixels a dropped point may be from the
+        simplified polyline. Not used for polylines that are
+        monotonic in x.
+
+    Return
+    ------
+    numpy.ndarray
+        The kept rows of `pixels`, in order.
+    """
+    P = np.asarray(pixels)
+    if len(P) < 3:
+        return P
+    # Drop repeated pixels
+    step = np.diff(P, axis=0)
+    repeat = (step == 0).all(axis=1)
+    if repeat.any():
+        if repeat.all():
+            return P[[0, -1]] # one pixel: keep it a line
+        P = P[np.concatenate(([True], ~repeat))]
+        step = np.diff(P, axis=0)
+    if len(P) < 3:
+        return P
+    if (step[:,0] >= 0).all() or (step[:,0] <= 0).all():
+        return P[_column_extremes(P)]
+    if tolerance > 0:
+        return P[_rdp(P, tolerance)]
+    return P
+
+def _column_extremes(P:np.ndarray) -> np.ndarray:
+    """Mask of the first, last, min y and max y point of each pixel column.
+
+    P is monotonic in x, so each column is one run of rows.
+    """
+    col = np.rint(P[:,0])
+    starts = np.flatnonzero(np.concatenate(([True], col[1:] != col[:-1])))
+    lengths = np.diff(np.append(starts, len(P)))
+    run = np.repeat(np.arange(len(starts)), lengths)
+    y = P[:,1]
+    keep = np.zeros(len(P), dtype=bool)
+    keep[starts] = True           # first
+    keep[starts + lengths - 1] = True # last
+    for reduce in (np.minimum, np.maximum):
+        extreme = (y == np.repeat(reduce.reduceat(y, starts), lengths))
+        i = np.flatnonzero(extreme)
+        # first row of each run at the extreme
+        keep[i[np.concatenate(([True], run[i][1:] != run[i][:-1]))]] = True
+    return keep
+
+def _rdp(P:np.ndarray, tolerance:float) -> np.ndarray:
+    """Mask of the points kept by Ramer–Douglas–Peucker simplification.
+
+    The spans are split level by level: each pass computes the
+    distances for every span still being split in one vectorized
+    step, instead of one Python iteration per kept point. Distance is
+    to the line segment, not the whole line, so points that double
+    back past an end are kept.
+    """
+    P = P.astype(np.float64)
+    keep = np.zeros(len(P), dtype=bool)
+    keep[0] = keep[-1] = True
+    todo = np.arange(1, len(P) - 1) # points in spans still being split
+    while todo.size:
+        kept = np.flatnonzero(keep)
+        after = np.searchsorted(kept, todo)
+        a = P[kept[after - 1]]; b = P[kept[after]]
+        d = b - a
+        w = P[todo] - a
+        dd = np.einsum('ij,ij->i', d, d)
+        t = np.clip(np.einsum('ij,ij->i', w, d)/np.where(dd, dd, 1), 0, 1)
+        w -= t[:,np.newaxis]*d
+        dist = np.einsum('ij,ij->i', w, w)
+        # todo is sorted, so each span is one run
+        span = after
+        starts = np.flatnonzero(np.concatenate(([True], span[1:] != span[:-1])))
+        lengths = np.diff(np.append(starts, len(todo)))
+        farthest = np.maximum.reduceat(dist, starts)
+        split = np.repeat(farthest > tolerance*tolerance, lengths)
+        i = np.flatnonzero(split & (dist == np.repeat(farthest, lengths)))
+        first = np.ones(len(i), dtype=bool)
+        first[1:] = span[i][1:] != span[i][:-1]
+        keep[todo[i[first]]] = True
+        todo = todo[split & ~keep[todo]]
+    return keep
+
+# ------------------
+# | Batched drawing |
+# ------------------
+
+class DrawList():
+    """Collect a frame's line segments and polylines, then draw them in bulk.
+
+    Calling :func:`draw_lineseg` once per wall means one coordinate
+    mapping and one pygame call per wall. A DrawList queues the
+    geometry instead. :meth:`flush` clips and maps everything of one
+    color to pixels in one vectorized pass, joins line segments that
+    share endpoints into polylines, and draws each polyline with one
+    ``pygame.draw.aalines`` call.
+
+    Example
+    -------
+    >>> import pygstuff as pygs
+    >>> win = pygs.Window()
+    >>> win.open_window(1200, 600)
+    >>> dl = DrawList(win)
+
+    A square drawn as four walls. They share endpoints, so they are
+    drawn as one polyline:
+    >>> corners = [pygs.Point(-50,-50), pygs.Point(50,-50),
+    ...            pygs.Point(50,50), pygs.Point(-50,50)]
+    >>> for i in range(4):
+    ...     dl.lineseg(pygs.LineSegment([corners[i], corners[(i+1)%4]]))
+    >>> dl.polyline([pygs.Point(0,0), pygs.Point(10,10)], rgb=(255,0,0))
+    >>> len(dl)
+    5
+    >>> dl.flush()
+    2
+    >>> len(dl)
+    0
+
+    The count is of the draw calls actually made. A polyline that is
+    off screen costs none; one that leaves the screen and comes back
+    is drawn as two pieces:
+    >>> dl.polyline([pygs.Point(5000,0), pygs.Point(6000,0)])
+    >>> dl.polyline([pygs.Point(-1000,0), pygs.Point(0,0), pygs.Point(0,1000),
+    ...              pygs.Point(100,1000), pygs.Point(100,0)])
+    >>> dl.flush()
+    2
+
+    Use it as a context manager to flush at the end of the block:
+    >>> with DrawList(win) as dl:
+    ...     dl.linesegs(pygs.SegmentStore([pygs.LineSegment.from_length(10)]))
+
+    Parameters
+    ----------
+    window
+        A pygame window, as defined by pygs.
+    pcsys
+        See :func:`pix_coord`. Read at flush time, so panning and
+        zooming during the frame is fine.
+    clip
+        Cull and clip off-screen geometry, as in :func:`draw_lineseg`.
+
+    Notes
+    -----
+    Geometry is drawn color by color, in the order each color was
+    first used. Within a color, all the line segments are drawn first,
+    then the polylines in the order they were queued.
+    """
+
+    def __init__(self,
+            window:pygs.Window,
+            pcsys:PixelCoordinateSystem = pcsys,
+            clip:bool = True
+            ):
+        self.window = window
+        self.pcsys = pcsys
+        self.clip = clip
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop everything queued."""
+        self._segments = {}   # rgb -> list of endpoint pairs and S×2×2 arrays
+        self._polylines = {}  # rgb -> list of N×2 arrays
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+        return False
+
+    def lineseg(self, l:pygs.LineSegment, rgb:tuple = (255,255,255)) -> None:
+        """Queue one line segment."""
+        self._segments.setdefault(tuple(rgb), []).append(l.endpoints)
+        self._count += 1
+
+    def linesegs(self, linesegs, rgb:tuple = (255,255,255)) -> None:
+        """Queue many line segments: a list of LineSegment or a SegmentStore."""
+        ends = pygs.PointArray.from_linesegs(linesegs).xy.reshape(-1, 2, 2)
+        self._segments.setdefault(tuple(rgb), []).append(ends)
+        self._count += len(ends)
+
+    def polyline(self, points, rgb:tuple = (255,255,255)) -> None:
+        """Queue line segments connecting the points (see :func:`draw_connect_points`)."""
+        xy = np.array(pygs.geometry._as_xy(points), dtype=np.float64).reshape(-1, 2)
+        if len(xy) >= 2:
+            self._polylines.setdefault(tuple(rgb), []).append(xy)
+            self._count += 1
+
+    def flush(self) -> int:
+        """Draw everything queued, then clear the queue.
+
+        Return
+        ------
+        int
+            Number of pygame draw calls made.
+        """
+        calls = self._draw(self.window)
+        self.clear()
+        return calls
+
+    def _draw(self, window) -> int:
+        """Draw everything queued on `window`. Return the number of draw calls."""
+        pcsys = _as_pcsys(self.pcsys)
+        calls = 0
+        for rgb in dict.fromkeys(list(self._segments) + list(self._polylines)):
+            if rgb in self._segments:
+                ends = np.concatenate([
+                    np.asarray(e, dtype=np.float64).reshape(-1, 2, 2)
+                    for e in _group_pairs(self._segments[rgb])
+                    ])
+                calls += _draw_segments(ends[:,0], ends[:,1], window, pcsys, rgb, self.clip)
+            for xy in self._polylines.get(rgb, ()):
+                if self.clip:
+                    calls += _draw_clipped_polyline(xy, window, pcsys, rgb)
+                else:
+                    _drawn(window, pygame.draw.aalines(window.surface, rgb, False, pcsys.to_pixels(xy, window)))
+                    calls += 1
+        return calls
+
+def _draw_segments(starts, ends, window, pcsys, rgb, clip:bool) -> int:
+    """Draw S line segments with as few aalines calls as possible.
+
+    Return the number of draw calls.
+    """
+    P = pcsys.to_pixels(starts, window)
+    Q = pcsys.to_pixels(ends, window)
+    if clip:
+        c = pygs.clip_arrays(starts, ends, pcsys.viewport(window))
+        cut = (c.t0 > 0) | (c.t1 < 1)
+        draw_stats.segments += len(c.keep)
+        draw_stats.culled += int(np.count_nonzero(~c.keep))
+        draw_stats.clipped += int(np.count_nonzero(c.keep & cut))
+        # Place the clipped ends on the pixel line of the unclipped segment.
+        k = np.flatnonzero(c.keep)
+        A = P[k]; d = Q[k] - A
+        P = A + c.t0[k,np.newaxis]*d
+        Q = A + c.t1[k,np.newaxis]*d
+    if len(P) == 0:
+        return 0
+    # Segment i+1 continues segment i if it starts where i ends.
+    chained = np.all(P[1:] == Q[:-1], axis=1)
+    bounds = [0] + (np.flatnonzero(~chained) + 1).tolist() + [len(P)]
+    surface = window.surface
+    P = P.tolist(); Q = Q.tolist()
+    for b, e in zip(bounds[:-1], bounds[1:]):
+        if e - b == 1:
+            _drawn(window, pygame.draw.aaline(surface, rgb, P[b], Q[b]))
+        else:
+            _drawn(window, pygame.draw.aalines(surface, rgb, False, [P[b]] + Q[b:e]))
+    return len(bounds) - 1
+
+def _group_pairs(queued:list) -> list:
+    """Batch runs of single endpoint pairs so they convert in one call."""
+    groups = []; pairs = []
+    for item in queued:
+        if isinstance(item, np.ndarray):
+            if pairs:
+                groups.append(pairs); pairs = []
+            groups.append(item)
+        else:
+            pairs.append(item)
+    if pairs:
+        groups.append(pairs)
+    return groups
+
+# --------------------
+# | NumPy rasterizer |
+# --------------------
+
+def draw_linesegs(
+        linesegs,
+        window:pygs.Window,
+        pcsys:PixelCoordinateSystem = pcsys,
+        rgb:tuple=(255,255,255),
+        clip:bool = True,
+        backend:str = 'pygame',
+        blend:str = 'over'
+        ) -> None:
+    """Draw many line segments in one call.
+
+    Parameters
+    ----------
+    linesegs
+        List of LineSegment, a SegmentStore, or an S×2×2 array of
+        endpoints (rows with NaN are skipped).
+    window
+        A pygame window, as defined by pygs.
+    pcsys
+        See :func:`pix_coord`.
+    rgb
+        Line color.
+    clip
+        Cull and clip off-screen line segments, as in
+        :func:`draw_lineseg`. The 'numpy' backend always clips (in
+        pixels); `clip` only decides if it counts in ``draw_stats``.
+    backend
+        'pygame' (default): ``pygame.draw.aalines``, batched as in
+        :class:`DrawList`.
+        'numpy': rasterize all the segments at once with
+        :func:`line_coverage` and blend them into the window's pixels
+        with ``pygame.surfarray``. About twice as fast for tens of
+        thousands of long line segments (e.g., rays). The cost of
+        scanning the whole window makes it slower for a few thousand.
+        On 8- and 16-bit surfaces, which surfarray cannot blend into,
+        the touched area is blended in a 32-bit copy and blitted back.
+    blend
+        How the 'numpy' backend combines lines with the window.
+        'over' (default): paint `rgb` over the window, like
+        antialiased lines.
+        'add': add `rgb` times the line coverage, saturating at 255.
+        Where many lines cross, the pixel gets brighter: a ray
+        density image.
+
+    Example
+    -------
+    >>> import pygstuff as pygs
+    >>> win = pygs.Window()
+    >>> win.open_window(1200, 600)
+    >>> rng = np.random.default_rng(0)
+    >>> A = rng.uniform(-500, 500, (1000,2))
+    >>> segs = np.stack((A, A + rng.uniform(-50, 50, (1000,2))), axis=1)
+
+    The two backends draw nearly the same pixels:
+    >>> drawn = []
+    >>> for backend in ('pygame', 'numpy'):
+    ...     _ = win.surface.fill((0,0,0))
+    ...     draw_linesegs(segs, win, backend=backend)
+    ...     drawn.append(pygame.surfarray.array3d(win.surface)[...,0] > 127)
+    >>> bool((drawn[0] != drawn[1]).mean() < 0.01)
+    True
+
+    Additive blending:
+    >>> _ = win.surface.fill((0,0,0))
+    >>> draw_linesegs(segs, win, rgb=(40,40,40), backend='numpy', blend='add')
+    >>> int(pygame.surfarray.array3d(win.surface).max()) > 40
+    True
+
+    A 16-bit surface works too:
+    >>> win.surface = pygame.Surface((1200, 600), depth=16)
+    >>> draw_linesegs(segs, win, backend='numpy')
+    >>> draw_linesegs(segs, win, rgb=(40,40,40), backend='numpy', blend='add')
+    >>> int(pygame.surfarray.array3d(win.surface).max()) > 40
+    True
+    """
+    if isinstance(linesegs, np.ndarray):
+        ends = np.asarray(linesegs, dtype=np.float64).reshape(-1, 2, 2)
+    else:
+        ends = pygs.PointArray.from_linesegs(linesegs).xy.reshape(-1, 2, 2)
+    ends = ends[np.isfinite(ends).all(axis=(1,2))]
+    pcsys = _as_pcsys(pcsys)
+    if backend == 'pygame':
+        _draw_segments(ends[:,0], ends[:,1], window, pcsys, tuple(rgb), clip)
+    elif backend == 'numpy':
+        _raster_segments(ends[:,0], ends[:,1], window, pcsys, rgb, clip, blend)
+    else:
+        raise ValueError(f"backend must be 'pygame' or 'numpy', not {backend!r}")
+
+def _raster_segments(starts, ends, window, pcsys, rgb, clip:bool, blend:str) -> None:
+    """Draw line segments with :func:`line_coverage` and surfarray."""
+    if blend not in ('over', 'add'):
+        raise ValueError(f"blend must be 'over' or 'add', not {blend!r}")
+    size = (window.width, window.height)
+    P = pcsys.to_pixels(starts, window)
+    Q = pcsys.to_pixels(ends, window)
+    c = pygs.clip_arrays(P, Q, (-1, -1, size[0], size[1]))
+    if clip:
+        draw_stats.segments += len(c.keep)
+        draw_stats.culled += int(np.count_nonzero(~c.keep))
+        draw_stats.clipped += int(np.count_nonzero(c.keep & ((c.t0 > 0) | (c.t1 < 1))))
+    if not c.keep.any():
+        return
+    coverage = _padded_coverage(c.starts[c.keep], c.ends[c.keep], size)
+    # Only blend the pixels the lines touch.
+    w, h = size
+    i = np.flatnonzero(coverage)
+    x = i//(h + 2) - 1; y = i%(h + 2) - 1
+    on = (x >= 0) & (x < w) & (y >= 0) & (y < h)
+    if not on.any():
+        return
+    x = x[on]; y = y[on]
+    rect = pygame.Rect(
+        x.min(), y.min(), x.max() - x.min() + 1, y.max() - y.min() + 1
+        )
+    if window.surface.get_bytesize() < 3:
+        # surfarray cannot blend into 8- or 16-bit pixels: blend the
+        # touched area in a 32-bit copy and blit it back.
+        area = pygame.Surface(rect.size, depth=32)
+        area.blit(window.surface, (0, 0), rect)
+        _blend(area, x - rect.x, y - rect.y, coverage[i[on]], rgb, blend)
+        window.surface.blit(area, rect)
+    else:
+        _blend(window.surface, x, y, coverage[i[on]], rgb, blend)
+    _drawn(window, rect)
+
+def _blend(surface, x, y, weight, rgb:tuple, blend:str) -> None:
+    """Blend `rgb` into pixels (x,y) of the surface, `weight` is the coverage."""
+    weight = weight.astype(np.float32)
+    if blend == 'over':
+        weight = np.minimum(weight, 1)
+    def mix(old, color, weight):
+        old = old.astype(np.float32)
+        if blend == 'add':
+            return np.minimum(old + weight*np.float32(color), 255)
+        return np.rint(old + weight*(np.float32(color) - old))
+    if surface.get_bytesize() == 4 and surface.get_pitch() == 4*surface.get_width():
+        # 32-bit pixels in one block: index the packed pixels of a flat
+        # view, several times faster than indexing pixels3d.
+        pixels = pygame.surfarray.pixels2d(surface).T.reshape(-1)
+        i = y*surface.get_width() + x
+        packed = pixels[i]
+        new = packed & ~np.uint32(sum(surface.get_masks()[:3]))
+        for color, shift in zip(rgb, surface.get_shifts()):
+            channel = mix((packed >> shift) & 0xFF, color, weight)
+            new |= channel.astype(np.uint32) << shift
+        pixels[i] = new
+    else:
+        pixels = pygame.surfarray.pixels3d(surface)
+        pixels[x, y] = mix(pixels[x, y], rgb, weight[:,np.newaxis])
+    del pixels # unlock the surface
+
+def line_coverage(starts, ends, size:tuple) -> np.ndarray:
+    """Rasterize line segments in pixel coordinates to a coverage buffer.
+
+    Antialiased like Xiaolin Wu's algorithm: the line is sampled once
+    per pixel column (or row, for steep lines), and each sample is
+    split between the two pixels it falls between. All the line
+    segments are sampled at once with NumPy, in chunks of about a
+    million samples.
+
+    Example
+    -------
+    A horizontal line half way between two pixel rows:
+    >>> c = line_coverage([[1, 1.5]], [[4, 1.5]], (6, 4))
+    >>> c.T
+    array([[0. , 0. , 0. , 0. , 0. , 0. ],
+           [0. , 0.5, 0.5, 0.5, 0.5, 0. ],
+           [0. , 0.5, 0.5, 0.5, 0.5, 0. ],
+           [0. , 0. , 0. , 0. , 0. , 0. ]])
+
+    Crossing lines add up:
+    >>> c = line_coverage([[0,2], [2,0]], [[4,2], [2,4]], (5, 5))
+    >>> float(c[2,2])
+    2.0
+
+    Parameters
+    ----------
+    starts, ends
+        S×2 arrays of line segment endpoints in pixels. The parts
+        outside the buffer are clipped off.
+    size
+        (width, height) of the buffer in pixels.
+
+    Return
+    ------
+    numpy.ndarray
+        width×height float array (indexed [x,y], like
+        ``pygame.surfarray``). Each line adds about 1 to each pixel
+        it covers.
+    """
+    w, h = size
+    return _padded_coverage(starts, ends, size).reshape(w + 2, h + 2)[1:-1, 1:-1]
+
+def _padded_coverage(starts, ends, size:tuple) -> np.ndarray:
+    """:func:`line_coverage` as a flat buffer, with a one pixel border.
+
+    The buffer is (width+2)×(height+2), so that every sample of a line
+    clipped to the pixels from -1 to width (or height) lands in it.
+    """
+    w, h = size
+    c = pygs.clip_arrays(
+        np.asarray(starts, dtype=np.float64).reshape(-1, 2),
+        np.asarray(ends, dtype=np.float64).reshape(-1, 2),
+        (-1, -1, w, h)
         )
+    P = c.starts[c.keep]; Q = c.ends[c.keep]
+    H = h + 2
+    coverage = np.zeros((w + 2)*H)
+    steep = np.abs(Q[:,1] - P[:,1]) > np.abs(Q[:,0] - P[:,0])
+    for group, (major, minor), limits, stride in (
+            (~steep, (0, 1), (w, h), (H, 1)),
+            (steep, (1, 0), (h, w), (1, H)),
+            ):
+        _wu_samples(
+            P[group,major], P[group,minor], Q[group,major], Q[group,minor],
+            limits, stride, coverage
+            )
+    return coverage
+
+# Line samples rasterized per chunk, to bound the memory used.
+_RASTER_CHUNK = 1 << 20
+
+def _wu_samples(m0, n0, m1, n1, limits, stride, coverage) -> None:
+    """Add the samples of lines from (m0,n0) to (m1,n1) to `coverage`.
+
+    m is the major axis: each line is sampled at every whole m from
+    rint(m0) to rint(m1). n is the minor axis. The lines are clipped
+    to -1 <= m <= limits[0] and -1 <= n <= limits[1]. `stride` is the
+    (m, n) step in the flat padded buffer.
+    """
+    if len(m0) == 0:
+        return
+    first = np.clip(np.rint(m0), -1, limits[0]).astype(np.int64)
+    last = np.clip(np.rint(m1), -1, limits[0]).astype(np.int64)
+    count = np.abs(last - first) + 1
+    sign = np.where(last < first, -1, 1)
+    dm = m1 - m0
+    slope = np.divide(n1 - n0, dm, out=np.zeros_like(dm), where=dm != 0)
+    intercept = n0 - m0*slope # n = intercept + m*slope
+    # Samples are float32: plenty for pixel coordinates, and half the
+    # memory traffic.
+    slope = slope.astype(np.float32); intercept = intercept.astype(np.float32)
+    ends = np.cumsum(count)
+    bounds = np.searchsorted(ends, np.arange(_RASTER_CHUNK, ends[-1], _RASTER_CHUNK))
+    chunks = np.unique(np.concatenate(([0], bounds, [len(count)])))
+    sm, sn = stride
+    for i, j in zip(chunks[:-1], chunks[1:]):
+        c = count[i:j]
+        # m steps by sign along each line, and jumps to the next
+        # line's first sample at each line start: one cumsum.
+        step = np.repeat(sign[i:j], c)
+        starts = ends[i:j] - c - (ends[i-1] if i else 0)
+        step[starts] = first[i:j] - np.concatenate(([0], last[i:j-1]))
+        m = np.cumsum(step)
+        n = np.repeat(intercept[i:j], c) + m*np.repeat(slope[i:j], c)
+        np.clip(n, -1, limits[1], out=n) # round-off from clipping
+        low = np.minimum(np.floor(n), limits[1] - 1)
+        frac = n - low
+        index = (m + 1)*sm + (low.astype(np.int64) + 1)*sn
+        coverage += np.bincount(index, 1 - frac, minlength=len(coverage))
+        coverage += np.bincount(index + sn, frac, minlength=len(coverage))
+
+# ----------------
+# | Cached layers |
+# ----------------
+
+# Something to draw on that is not the window: what the draw functions
+# need from a Window.
+_Canvas = namedtuple('_Canvas', ['surface', 'width', 'height'])
+
+class StaticLayer(DrawList):
+    """Geometry that does not change between frames, drawn once and cached.
+
+    A StaticLayer takes geometry like a :class:`DrawList`, but keeps
+    it. The first :meth:`flush` draws it to an off-screen
+    ``pygame.Surface``. Later calls only blit that surface to the
+    window, so static walls cost one blit per frame instead of a
+    coordinate mapping and a draw call per wall.
+
+    The cached surface is redrawn when the geometry changes, when the
+    pixel coordinate system is panned or zoomed (scale or origin
+    changes), or when the window size changes. Call
+    :meth:`invalidate` to force a redraw.
+
+    Example
+    -------
+    >>> import pygstuff as pygs
+    >>> win = pygs.Window()
+    >>> win.open_window(1200, 600)
+    >>> pc = PixelCoordinateSystem()
+    >>> walls = StaticLayer(win, pc, background=(0,0,0))
+    >>> segs = [pygs.LineSegment([pygs.Point(-90,0), pygs.Point(100,10)]),
+    ...         pygs.LineSegment([pygs.Point(0,-70), pygs.Point(5,80)])]
+    >>> walls.linesegs(segs)
+
+    The first frame draws the layer, the next ones only blit it:
+    >>> walls.flush()
+    2
+    >>> walls.flush()
+    0
+
+    Zooming redraws it:
+    >>> pc.scale = 2
+    >>> walls.flush()
+    2
+
+    Same pixels as drawing the walls directly:
+    >>> walls.flush()
+    0
+    >>> cached = pygame.surfarray.array3d(win.surface)
+    >>> _ = win.surface.fill((0,0,0))
+    >>> with DrawList(win, pc) as dl:
+    ...     dl.linesegs(segs)
+    >>> bool((pygame.surfarray.array3d(win.surface) == cached).all())
+    True
+
+    Parameters
+    ----------
+    window
+        A pygame window, as defined by pygs.
+    pcsys
+        See :func:`pix_coord`.
+    clip
+        Cull and clip off-screen geometry, as in :func:`draw_lineseg`.
+    background
+        None (default): the layer is transparent and blitted over
+        whatever is already on the window. Antialiased edges on a
+        transparent surface blend a little differently than edges
+        drawn on the window.
+        An rgb color: the layer is opaque and filled with this color.
+        Flushing it replaces clearing the window, and the pixels are
+        the same as drawing directly on a window filled with this
+        color.
+    """
+
+    def __init__(self,
+            window:pygs.Window,
+            pcsys:PixelCoordinateSystem = pcsys,
+            clip:bool = True,
+            background:tuple = None
+            ):
+        self.background = background
+        self._surface = None
+        super().__init__(window, pcsys, clip)
+
+    def invalidate(self) -> None:
+        """Redraw the cached surface at the next flush."""
+        self._key = None
+
+    def clear(self) -> None:
+        """Drop all the geometry."""
+        super().clear()
+        self.invalidate()
+
+    def lineseg(self, l:pygs.LineSegment, rgb:tuple = (255,255,255)) -> None:
+        super().lineseg(l, rgb)
+        self.invalidate()
+
+    def linesegs(self, linesegs, rgb:tuple = (255,255,255)) -> None:
+        super().linesegs(linesegs, rgb)
+        self.invalidate()
+
+    def polyline(self, points, rgb:tuple = (255,255,255)) -> None:
+        super().polyline(points, rgb)
+        self.invalidate()
+
+    def flush(self) -> int:
+        """Blit the layer to the window, redrawing it first if it is stale.
+
+        The geometry is kept.
+
+        Return
+        ------
+        int
+            Number of pygame draw calls made: 0 if the cached surface
+            was used.
+        """
+        window = self.window
+        pc = _as_pcsys(self.pcsys)
+        key = (pc.scale, pc.origin, window.width, window.height)
+        calls = 0
+        if key != self._key:
+            calls = self._render(window)
+            self._key = key
+            _drawn(window, window.surface.get_rect())
+        window.surface.blit(self._surface, (0,0))
+        return calls
 
+    def _render(self, window) -> int:
+        size = (window.width, window.height)
+        if self._surface is None or self._surface.get_size() != size:
+            if self.background is None:
+                self._surface = pygame.Surface(size, pygame.SRCALPHA)
+            else:
+                self._surface = pygame.Surface(size).convert(window.surface)
+        self._surface.fill((0,0,0,0) if self.background is None else self.background)
+        return self._draw(_Canvas(self._surface, *size))
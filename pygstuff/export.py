@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Save the frames of a game loop without slowing it down.
+
+A :class:`FrameExporter` copies each frame's pixels and hands them to
+a background writer. The writer saves a PNG sequence, or writes raw
+RGB bytes to a file or pipe (e.g., the stdin of ffmpeg). Frames wait
+in a bounded queue, so a slow disk costs memory up to the queue size
+and then either slows the loop down or drops frames, your choice.
+
+Use it with a headless window to render on a server with no display:
+
+>>> import pygstuff as pygs
+>>> win = pygs.Window(headless=True)
+>>> win.open_window(320, 200)
+
+Then, in the loop, ``exporter.write(win.surface)`` after drawing.
+"""
+
+import os
+import queue
+import threading
+import multiprocessing
+import pygame
+
+# pygame 2.1.3 renamed tostring/fromstring to tobytes/frombytes
+_tobytes = getattr(pygame.image, 'tobytes', None) or pygame.image.tostring
+_frombytes = getattr(pygame.image, 'frombytes', None) or pygame.image.fromstring
+
+class FrameExporter(object):
+    """Write frames in the background: a PNG sequence or a raw RGB stream.
+
+    Example
+    -------
+    >>> import tempfile, pathlib
+    >>> import pygstuff as pygs
+    >>> win = pygs.Window(headless=True)
+    >>> win.open_window(64, 48)
+    >>> folder = pathlib.Path(tempfile.mkdtemp())
+
+    A PNG sequence. The target has a ``{}`` for the frame number:
+    >>> with FrameExporter(folder/'frame_{:04d}.png') as exporter:
+    ...     for i in range(3):
+    ...         _ = win.surface.fill((80*i, 0, 0))
+    ...         exporter.write(win.surface)
+    >>> sorted(p.name for p in folder.glob('*.png'))
+    ['frame_0000.png', 'frame_0001.png', 'frame_0002.png']
+    >>> tuple(pygame.image.load(str(folder/'frame_0002.png')).get_at((0,0)))
+    (160, 0, 0, 255)
+
+    A raw RGB stream, 64*48*3 bytes per frame:
+    >>> with FrameExporter(str(folder/'frames.rgb')) as exporter:
+    ...     for i in range(3):
+    ...         exporter.write(win.surface)
+    >>> (folder/'frames.rgb').stat().st_size == 3*64*48*3
+    True
+    >>> exporter.written
+    3
+
+    If the writer fails (a missing folder, a full disk), the next
+    write() raises, and so does close():
+    >>> import time
+    >>> exporter = FrameExporter(folder/'missing'/'frame_{}.png')
+    >>> try:
+    ...     for i in range(1000):
+    ...         exporter.write(win.surface)
+    ...         time.sleep(0.01)
+    ... except RuntimeError as e:
+    ...     print(e)
+    frame writer failed
+    >>> exporter.written
+    0
+    >>> exporter.close()
+    Traceback (most recent call last):
+    ...
+    RuntimeError: frame writer failed
+
+    Parameters
+    ----------
+    target
+        Where the frames go:
+
+        - a path (str or pathlib.Path) with a ``{}`` field, e.g.
+          ``'out/frame_{:05d}.png'``:
+          one PNG per frame (or any format pygame.image.save knows)
+        - any other path: a raw RGB stream, frames back to back
+        - a binary file object (e.g. ``subprocess.Popen(...).stdin``):
+          a raw RGB stream
+    maxsize
+        Most frames waiting to be written. Each frame is
+        width*height*3 bytes.
+    when_full
+        What write() does when the queue is full:
+        'block' (default) waits for the writer, no frame is lost;
+        'drop' drops the frame and counts it in ``dropped``, the loop
+        never waits.
+    process
+        If True, write in a separate process instead of a thread.
+        PNG compression then runs on another core instead of holding
+        the GIL. `target` must be a path.
+    """
+
+    def __init__(self, target, maxsize=8, when_full='block', process=False):
+        if when_full not in ('block', 'drop'):
+            raise ValueError(f"when_full must be 'block' or 'drop', not {when_full!r}")
+        if process and not isinstance(target, (str, os.PathLike)):
+            raise ValueError("process=True needs a path target, not a file object")
+        self.when_full = when_full
+        self.frames = 0  # frames passed to write()
+        self.dropped = 0 # frames dropped because the queue was full
+        self._error = None
+        if process:
+            context = multiprocessing.get_context('spawn')
+            self._queue = context.Queue(maxsize)
+            self._done = context.Value('i', 0)
+            self._errors = context.Queue()
+            self._worker = context.Process(
+                target=_writer,
+                args=(self._queue, os.fspath(target), self._done, self._errors.put),
+                daemon=True
+                )
+        else:
+            self._queue = queue.Queue(maxsize)
+            self._done = _Counter()
+            self._errors = None
+            self._worker = threading.Thread(
+                target=_writer,
+                args=(self._queue, target, self._done, self._failed),
+                daemon=True
+                )
+        self._worker.start()
+
+    def _failed(self, error):
+        self._error = error
+
+    @property
+    def written(self):
+        """Number of frames written so far."""
+        return self._done.value
+
+    def write(self, surface):
+        """Copy the pixels of `surface` and queue them for writing."""
+        self._check()
+        frame = (self.frames, surface.get_size(), _tobytes(surface, 'RGB'))
+        self.frames += 1
+        if self.when_full == 'block':
+            self._put(frame)
+            return
+        try:
+            self._queue.put_nowait(frame)
+        except queue.Full:
+            self.dropped += 1
+
+    def _put(self, item):
+        """Queue `item`, waiting for room as long as the writer is alive."""
+        while True:
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if not self._worker.is_alive():
+                    self._check()
+                    raise RuntimeError("frame writer stopped")
+
+    def close(self):
+        """Write the frames still queued, then stop the writer."""
+        if self._worker is None:
+            return
+        try:
+            self._put(None)
+        except RuntimeError:
+            pass # the writer is gone; report why below
+        self._worker.join()
+        try:
+            self._check()
+        finally:
+            self._worker = None
+
+    def _check(self):
+        if self._error is None and self._errors is not None:
+            try:
+                self._error = self._errors.get_nowait()
+            except queue.Empty:
+                pass
+        if self._error is not None:
+            raise RuntimeError("frame writer failed") from self._error
+        if getattr(self._worker, 'exitcode', None):
+            raise RuntimeError(f"frame writer exited with code {self._worker.exitcode}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        try:
+            self.close()
+        except RuntimeError:
+            if exc_type is None:
+                raise
+            # write() already raised the writer's error: don't hide it
+        return False
+
+class _Counter(object):
+    '''Stand-in for a multiprocessing.Value in the same process.'''
+    value = 0
+
+def _writer(frames, target, done, failed):
+    '''Write the frames. On error, report it with `failed`, then empty
+    the queue.
+
+    The error is reported first, so the next write() raises it.
+    Emptying the queue until the None sentinel means write() and
+    close() never wait forever on a writer that failed.
+    '''
+    try:
+        _write_frames(frames, target, done)
+    except BaseException as e:
+        failed(e)
+        while frames.get() is not None:
+            pass
+
+def _write_frames(frames, target, done):
+    '''Write frames from the queue until the None sentinel.'''
+    if isinstance(target, os.PathLike):
+        target = os.fspath(target)
+    sequence = isinstance(target, str) and '{' in target
+    stream = None
+    try:
+        if not sequence:
+            if isinstance(target, (str, os.PathLike)):
+                stream = open(target, 'wb')
+            else:
+                stream = target
+        while True:
+            frame = frames.get()
+            if frame is None:
+                break
+            index, size, pixels = frame
+            if sequence:
+                pygame.image.save(
+                    _frombytes(pixels, size, 'RGB'), target.format(index)
+                    )
+            else:
+                stream.write(pixels)
+            done.value += 1
+    finally:
+        if stream is not None:
+            if stream is target:
+                stream.flush()
+            else:
+                stream.close()
+
+if __name__ == '__main__':
+    import doctest
+    print(doctest.testmod())
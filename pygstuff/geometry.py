@@ -13,7 +13,9 @@ applications.
 """
 
 from collections import namedtuple
+from fractions import Fraction
 import math
+import numpy as np
 
 # -----------------------------------
 # | Create points and line segments |
@@ -134,6 +136,395 @@ class PointMath():
         all_x, all_y = tuple(zip(*points))
         return Point( sum(all_x), sum(all_y) )
 
+    # ------------------------
+    # | Rational trigonometry |
+    # ------------------------
+    # Quadrance replaces distance and spread replaces angle. Neither
+    # needs sqrt or atan, so they are cheap, and they stay exact for
+    # int and Fraction coordinates.
+
+    @staticmethod
+    def quadrance(A:Point, B:Point):
+        """Return the quadrance between points A and B.
+
+        Quadrance is distance squared. Use it to compare or sort
+        distances without taking a square root.
+
+        Example
+        -------
+        >>> PointMath.quadrance(Point(1,2), Point(4,6))
+        25
+
+        Exact inputs stay exact:
+        >>> from fractions import Fraction
+        >>> PointMath.quadrance(Point(0,0), Point(Fraction(1,2),1))
+        Fraction(5, 4)
+        """
+        dx = B.x - A.x; dy = B.y - A.y
+        return dx*dx + dy*dy
+
+    @staticmethod
+    def cross(u:Point, v:Point):
+        """Return the 2D cross product of vectors u and v.
+
+        This is ``u.x*v.y - u.y*v.x``. It is zero when u and v are
+        parallel, positive when v is counter-clockwise from u, and
+        negative when v is clockwise from u.
+
+        Example
+        -------
+        >>> PointMath.cross(Point(1,0), Point(0,1))
+        1
+        >>> PointMath.cross(Point(1,1), Point(2,2))
+        0
+        """
+        return u.x*v.y - u.y*v.x
+
+    @staticmethod
+    def spread(u:Point, v:Point):
+        """Return the spread between vectors u and v.
+
+        Spread is sin² of the angle between the vectors: 0 for
+        parallel, 1 for perpendicular. Like sin², it does not tell
+        an angle from its supplement.
+
+        Example
+        -------
+        >>> PointMath.spread(Point(1,0), Point(0,3))
+        Fraction(1, 1)
+        >>> PointMath.spread(Point(1,0), Point(1,1))
+        Fraction(1, 2)
+
+        Float inputs give a float:
+        >>> PointMath.spread(Point(1.0,0), Point(1,1))
+        0.5
+
+        A zero vector has no direction. The spread is NaN, like in
+        :meth:`PointArray.spread`:
+        >>> PointMath.spread(Point(0,0), Point(1,1))
+        nan
+
+        Return
+        ------
+        Fraction or float
+            A Fraction if all coordinates are int or Fraction,
+            otherwise a float. NaN if u or v is a zero vector.
+        """
+        c = u.x*v.y - u.y*v.x
+        d = (u.x*u.x + u.y*u.y)*(v.x*v.x + v.y*v.y)
+        if d == 0:
+            return float('nan')
+        return _ratio(c*c, d)
+
+def _ratio(n, d):
+    """Return n/d, as a Fraction if n and d are exact (int or Fraction)."""
+    if type(n) is float or type(d) is float:
+        return n/d
+    if isinstance(n, (int, Fraction)) and isinstance(d, (int, Fraction)):
+        return Fraction(n, d)
+    return n/d
+
+class PointArray():
+    """An array of points stored as one N×2 float64 buffer.
+
+    :class:`PointArray` is the batch version of :class:`Point`. It has
+    the same ``add``, ``scale`` and ``subtract`` operations as
+    :class:`PointMath`, but each operation transforms every point in
+    the array in one call instead of one ``Point`` at a time.
+
+    Example
+    -------
+    Make a PointArray from a list of points:
+    >>> pa = PointArray([Point(1,2), Point(3,4), Point(5,6)])
+    >>> pa
+    PointArray([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]])
+    >>> len(pa)
+    3
+
+    Index it to get a Point back:
+    >>> pa[1]
+    Point(x=3.0, y=4.0)
+
+    Slice it to get a PointArray back:
+    >>> pa[1:]
+    PointArray([[3.0, 4.0], [5.0, 6.0]])
+
+    The x and y columns are views into the buffer:
+    >>> pa.x
+    array([1., 3., 5.])
+
+    A LineSegment's endpoints convert directly:
+    >>> l = LineSegment([Point(-5,0), Point(5,0)])
+    >>> PointArray(l.endpoints)
+    PointArray([[-5.0, 0.0], [5.0, 0.0]])
+
+    Convert back to a tuple of Points, e.g., to make a LineSegment:
+    >>> LineSegment(PointArray([(0,0),(1,1)]).to_points()).endpoints
+    (Point(x=0.0, y=0.0), Point(x=1.0, y=1.0))
+
+    Parameters
+    ----------
+    points
+        Anything NumPy can turn into an N×2 array: a list of Points,
+        a tuple of (x,y) tuples, another PointArray, or an N×2
+        ``numpy.ndarray``. A single Point makes a PointArray of
+        length 1.
+
+    Notes
+    -----
+    The buffer is the attribute ``xy``. It is a plain
+    ``numpy.ndarray`` with shape (N,2) and dtype float64. Hand it to
+    NumPy directly when the operations here are not enough.
+
+    ``np.asarray(pa)`` is the buffer itself; ``np.array(pa)`` is a
+    copy, as for any array:
+    >>> pa = PointArray([(1,2), (3,4)])
+    >>> np.asarray(pa) is pa.xy
+    True
+    >>> a = np.array(pa)
+    >>> a[0] = 9
+    >>> pa[0]
+    Point(x=1.0, y=2.0)
+    """
+
+    def __init__(self, points):
+        self.xy = np.array(points, dtype=np.float64).reshape(-1, 2)
+
+    @classmethod
+    def from_xy(cls, x, y) -> object:
+        """Alternative PointArray definition by x and y columns.
+
+        Example
+        -------
+        >>> PointArray.from_xy([0,1,2], [10,20,30])
+        PointArray([[0.0, 10.0], [1.0, 20.0], [2.0, 30.0]])
+        """
+        return cls(np.column_stack((
+            np.asarray(x, dtype=np.float64),
+            np.asarray(y, dtype=np.float64)
+            )))
+
+    @classmethod
+    def from_linesegs(cls, linesegs:list) -> object:
+        """Alternative PointArray definition from line segment endpoints.
+
+        The endpoints are listed in order: both endpoints of the first
+        segment, then both endpoints of the second segment, etc.
+        Endpoints ``2*i`` and ``2*i+1`` belong to segment ``i``.
+
+        Example
+        -------
+        >>> segs = [
+        ...     LineSegment([Point(0,0), Point(1,0)]),
+        ...     LineSegment([Point(0,1), Point(1,1)]),
+        ...     ]
+        >>> PointArray.from_linesegs(segs)
+        PointArray([[0.0, 0.0], [1.0, 0.0], [0.0, 1.0], [1.0, 1.0]])
+        """
+        if isinstance(linesegs, SegmentStore):
+            return cls(linesegs.endpoints)
+        return cls([p for l in linesegs for p in l.endpoints])
+
+    @property
+    def x(self) -> np.ndarray:
+        """Return the x coordinates (a view, not a copy)."""
+        return self.xy[:,0]
+
+    @property
+    def y(self) -> np.ndarray:
+        """Return the y coordinates (a view, not a copy)."""
+        return self.xy[:,1]
+
+    def to_points(self) -> tuple:
+        """Return the points as a tuple of Point."""
+        return tuple(Point(x,y) for x,y in self.xy.tolist())
+
+    def __len__(self):
+        return len(self.xy)
+
+    def __iter__(self):
+        return iter(self.to_points())
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            x, y = self.xy[index].tolist()
+            return Point(x,y)
+        return PointArray(self.xy[index])
+
+    def __array__(self, dtype=None, copy=None):
+        return np.array(self.xy, dtype=dtype, copy=copy)
+
+    def __eq__(self, other):
+        return np.array_equal(self.xy, _as_xy(other))
+
+    def __repr__(self):
+        return f"PointArray({self.xy.tolist()})"
+
+    @staticmethod
+    def scale(points, scale) -> object:
+        """Scale every point in the array.
+
+        Example
+        -------
+        >>> PointArray.scale(PointArray([(1,2),(3,4)]), -1)
+        PointArray([[-1.0, -2.0], [-3.0, -4.0]])
+
+        Give one scale per point to scale each point differently:
+        >>> PointArray.scale(PointArray([(1,2),(3,4)]), [2,10])
+        PointArray([[2.0, 4.0], [30.0, 40.0]])
+
+        Parameters
+        ----------
+        points
+            A PointArray (or anything PointArray accepts).
+        scale
+            A scalar, or an array of N scalars (one per point).
+
+        Return
+        ------
+        object
+            Return a PointArray instance as the scaled points.
+        """
+        scale = np.asarray(scale, dtype=np.float64)
+        if scale.ndim == 1:
+            scale = scale[:,np.newaxis]
+        return PointArray(_as_xy(points)*scale)
+
+    @staticmethod
+    def subtract(A, B) -> object:
+        """Return points B-A.
+
+        Same argument order as :meth:`PointMath.subtract`. Either
+        argument can be a single Point, which is subtracted from (or
+        subtracts) every point in the other array.
+
+        Example
+        -------
+        >>> A = PointArray([(1,2),(0,0)])
+        >>> B = PointArray([(3,4),(1,1)])
+        >>> PointArray.subtract(A,B)
+        PointArray([[2.0, 2.0], [1.0, 1.0]])
+
+        Subtract one Point from every point:
+        >>> PointArray.subtract(Point(1,1), B)
+        PointArray([[2.0, 3.0], [0.0, 0.0]])
+
+        The vector along each of many line segments:
+        >>> segs = [LineSegment.from_length(2, angle=a) for a in (0,90)]
+        >>> ends = PointArray.from_linesegs(segs)
+        >>> d = PointArray.subtract(ends[0::2], ends[1::2])
+        >>> d.xy.round(12).tolist()
+        [[2.0, 0.0], [0.0, 2.0]]
+
+        Return
+        ------
+        object
+            Return a PointArray instance as the difference between
+            the points.
+        """
+        return PointArray(_as_xy(B) - _as_xy(A))
+
+    @staticmethod
+    def add(points:list) -> object:
+        """Add the point arrays in the list.
+
+        Works for an arbitrary number of arrays. The arrays are added
+        point by point, so they must all have the same length, except
+        that a single Point is added to every point.
+
+        Example
+        -------
+        >>> a = PointArray([(1,2),(3,4)])
+        >>> b = PointArray([(10,20),(30,40)])
+        >>> PointArray.add([a,b])
+        PointArray([[11.0, 22.0], [33.0, 44.0]])
+
+        Shift every point by the same offset:
+        >>> PointArray.add([a, Point(100,0)])
+        PointArray([[101.0, 2.0], [103.0, 4.0]])
+
+        Adding does not work for an empty list:
+        >>> PointArray.add([])
+        Traceback (most recent call last):
+        ...
+        ValueError: Point addition is undefined for an empty list.
+
+        Parameters
+        ----------
+        points
+            List of PointArrays (or Points) to add.
+
+        Return
+        ------
+        object
+            Return a PointArray instance as the sum of the points.
+        """
+        if len(points) == 0:
+            raise ValueError("Point addition is undefined for an empty list.")
+        total = _as_xy(points[0]).copy()
+        for p in points[1:]:
+            total = total + _as_xy(p)
+        return PointArray(total)
+
+    @staticmethod
+    def quadrance(A, B) -> np.ndarray:
+        """Return the quadrance between each pair of points in A and B.
+
+        Batch version of :meth:`PointMath.quadrance`.
+
+        Example
+        -------
+        >>> PointArray.quadrance(PointArray([(0,0),(1,1)]), Point(3,4)).tolist()
+        [25.0, 13.0]
+        """
+        d = _as_xy(B) - _as_xy(A)
+        return np.einsum('...i,...i->...', d, d)
+
+    @staticmethod
+    def cross(u, v) -> np.ndarray:
+        """Return the 2D cross product of each pair of vectors in u and v.
+
+        Batch version of :meth:`PointMath.cross`.
+
+        Example
+        -------
+        >>> PointArray.cross(PointArray([(1,0),(1,1)]), PointArray([(0,1),(2,2)])).tolist()
+        [1.0, 0.0]
+        """
+        u = _as_xy(u); v = _as_xy(v)
+        return u[...,0]*v[...,1] - u[...,1]*v[...,0]
+
+    @staticmethod
+    def spread(u, v) -> np.ndarray:
+        """Return the spread between each pair of vectors in u and v.
+
+        Batch version of :meth:`PointMath.spread`. NaN where a vector
+        is zero.
+
+        Example
+        -------
+        >>> PointArray.spread(PointArray([(1,0),(1,0)]), PointArray([(0,3),(1,1)])).tolist()
+        [1.0, 0.5]
+        """
+        u = _as_xy(u); v = _as_xy(v)
+        c = u[...,0]*v[...,1] - u[...,1]*v[...,0]
+        qu = np.einsum('...i,...i->...', u, u)
+        qv = np.einsum('...i,...i->...', v, v)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return c*c/(qu*qv)
+
+def _as_xy(points) -> np.ndarray:
+    """Return `points` as an N×2 float64 ndarray (no copy if possible).
+
+    A single Point becomes shape (2,) so it broadcasts against N×2.
+    """
+    if isinstance(points, PointArray):
+        return points.xy
+    xy = np.asarray(points, dtype=np.float64)
+    if xy.ndim == 1 and xy.shape[0] == 2:
+        return xy
+    return xy.reshape(-1, 2)
+
 class LineSegment():
     """Define a line segment.
 
@@ -253,15 +644,111 @@ class LineSegment():
 
     @property
     def angle(self) -> float:
-        """Return the angle (in degrees) of the line segment.
+        """Return the angle (in radians) of the line segment.
+
+        The angle is between -π/2 and π/2. A vertical line segment
+        is π/2 (or -π/2 if it points down).
 
+        Example
+        -------
+        >>> LineSegment([Point(0,0), Point(0,-1)]).angle
+        -1.5707963267948966
         """
         a = self.endpoints[0]
         b = self.endpoints[1]
         dy = b.y-a.y
         dx = b.x-a.x
+        if dx == 0:
+            return math.copysign(math.pi/2, dy)
         return math.atan(dy/dx)
 
+    @property
+    def quadrance(self):
+        """Return the quadrance (length squared) of the line segment.
+
+        Example
+        -------
+        >>> LineSegment([Point(0,0), Point(3,4)]).quadrance
+        25
+        """
+        return PointMath.quadrance(*self.endpoints)
+
+    @property
+    def direction(self) -> Point:
+        """Return the vector from the first endpoint to the second."""
+        a, b = self.endpoints
+        return Point(b.x - a.x, b.y - a.y)
+
+    def spread(self, other):
+        """Return the spread between this and another LineSegment or Line.
+
+        See :meth:`PointMath.spread`.
+
+        Example
+        -------
+        >>> l = LineSegment([Point(0,0), Point(2,0)])
+        >>> l.spread(LineSegment([Point(0,0), Point(1,1)]))
+        Fraction(1, 2)
+        >>> l.spread(Line(slope=(0,1)))
+        Fraction(1, 1)
+
+        A segment with both endpoints the same has no direction:
+        >>> l.spread(LineSegment([Point(1,1), Point(1,1)]))
+        nan
+        """
+        return PointMath.spread(self.direction, other.direction)
+
+    def cross(self, other):
+        """Return the cross product of this and another LineSegment or Line.
+
+        Zero means parallel. See :meth:`PointMath.cross`.
+        """
+        return PointMath.cross(self.direction, other.direction)
+
+    def clip(self, rect:tuple) -> object:
+        """Return the part of the line segment inside a rectangle.
+
+        Liang–Barsky clipping.
+
+        Example
+        -------
+        >>> l = LineSegment([Point(-10,0), Point(10,0)])
+        >>> l.clip((-1,-1,1,1)).endpoints
+        (Point(x=-1.0, y=0.0), Point(x=1.0, y=0.0))
+
+        A line segment inside the rectangle comes back unchanged:
+        >>> l.clip((-20,-1,20,1)) is l
+        True
+
+        A line segment outside the rectangle comes back as None:
+        >>> print(l.clip((-1,5,1,6)))
+        None
+
+        Parameters
+        ----------
+        rect
+            (xmin, ymin, xmax, ymax)
+
+        Return
+        ------
+        object
+            A line segment of the same type, ``self`` if nothing was
+            clipped, or None if the line segment is outside the
+            rectangle.
+        """
+        a, b = self.endpoints
+        clipped = _clip_t(a, b, rect)
+        if clipped is None:
+            return None
+        t0, t1 = clipped
+        if t0 == 0 and t1 == 1:
+            return self
+        dx = b.x - a.x; dy = b.y - a.y
+        return type(self)([
+            Point(a.x + t0*dx, a.y + t0*dy),
+            Point(a.x + t1*dx, a.y + t1*dy)
+            ])
+
     # @property
     # def endpoints(self) -> list:
     #     """Return the end points of the line segment
@@ -277,6 +764,267 @@ class LineSegment():
     #         Point(self.midpoint.x + self.width/2, self.midpoint.y)
     #         )
 
+class FrozenLineSegment():
+    """A line segment that cannot move, so it caches its properties.
+
+    Same interface as :class:`LineSegment`, but the endpoints are
+    read-only, and length, midpoint and angle are calculated on the
+    first read and then stored. The class uses ``__slots__``, so an
+    instance has no ``__dict__`` and takes less memory.
+
+    Example
+    -------
+    >>> l = FrozenLineSegment([Point(-5.4,0), Point(5.4,0)])
+    >>> print(l.endpoints)
+    (Point(x=-5.4, y=0), Point(x=5.4, y=0))
+    >>> print(l.length)
+    10.8
+    >>> print(l.midpoint)
+    Point(x=0.0, y=0.0)
+
+    The alternative constructor works too:
+    >>> FrozenLineSegment.from_length(12, angle=60).endpoints[1]
+    Point(x=3.000000000000001, y=5.196152422706632)
+
+    Freeze an existing LineSegment:
+    >>> FrozenLineSegment.freeze(LineSegment.from_length(2)).length
+    2.0
+
+    The endpoints cannot change:
+    >>> l.endpoints = (Point(0,0), Point(1,1))
+    Traceback (most recent call last):
+    ...
+    AttributeError: FrozenLineSegment endpoints are read-only.
+    """
+    __slots__ = ('_endpoints', '_midpoint', '_length', '_angle')
+
+    def __init__(self, endpoints:list):
+        object.__setattr__(self, '_endpoints', tuple(endpoints))
+
+    from_length = classmethod(LineSegment.from_length.__func__)
+
+    @classmethod
+    def freeze(cls, lineseg:LineSegment) -> object:
+        """Return a FrozenLineSegment with the endpoints of `lineseg`."""
+        return cls(lineseg.endpoints)
+
+    def __setattr__(self, name, value):
+        if name == 'endpoints':
+            raise AttributeError("FrozenLineSegment endpoints are read-only.")
+        object.__setattr__(self, name, value)
+
+    @property
+    def endpoints(self) -> tuple:
+        """Return the endpoints of the line segment."""
+        return self._endpoints
+
+    @property
+    def midpoint(self) -> Point:
+        """Return the midpoint of the line segment (cached)."""
+        try:
+            return self._midpoint
+        except AttributeError:
+            self._midpoint = LineSegment.midpoint.fget(self)
+            return self._midpoint
+
+    @property
+    def length(self) -> float:
+        """Return the length of the line segment (cached)."""
+        try:
+            return self._length
+        except AttributeError:
+            self._length = LineSegment.length.fget(self)
+            return self._length
+
+    @property
+    def angle(self) -> float:
+        """Return the angle of the line segment (cached)."""
+        try:
+            return self._angle
+        except AttributeError:
+            self._angle = LineSegment.angle.fget(self)
+            return self._angle
+
+    @property
+    def quadrance(self):
+        """Return the quadrance of the line segment."""
+        return PointMath.quadrance(*self._endpoints)
+
+    direction = LineSegment.direction
+    spread = LineSegment.spread
+    cross = LineSegment.cross
+    clip = LineSegment.clip
+
+class SegmentStore():
+    """Many line segments stored as one array (structure of arrays).
+
+    All endpoints live in one contiguous S×2×2 float64 buffer, the
+    attribute ``endpoints``: ``endpoints[i,0]`` and ``endpoints[i,1]``
+    are the two endpoints of segment ``i``. The lengths, midpoints and
+    angles of all segments are calculated together in one pass the
+    first time they are read, then cached until the endpoints change.
+
+    Example
+    -------
+    >>> store = SegmentStore([
+    ...     LineSegment([Point(-5.4,0), Point(5.4,0)]),
+    ...     LineSegment([Point(0,0), Point(3,4)]),
+    ...     ])
+    >>> len(store)
+    2
+    >>> store.lengths.tolist()
+    [10.8, 5.0]
+    >>> store.midpoints
+    PointArray([[0.0, 0.0], [1.5, 2.0]])
+
+    Angles match :attr:`LineSegment.angle`:
+    >>> store.angles.tolist() == [l.angle for l in store]
+    True
+
+    Index it to get one segment back:
+    >>> store[1].endpoints
+    (Point(x=0.0, y=0.0), Point(x=3.0, y=4.0))
+
+    Move a segment. The cached properties are recalculated:
+    >>> store[1] = LineSegment([Point(0,0), Point(0,2)])
+    >>> store.lengths.tolist()
+    [10.8, 2.0]
+
+    Parameters
+    ----------
+    linesegs
+        List of LineSegment (or FrozenLineSegment).
+
+    Notes
+    -----
+    If you write to ``endpoints`` directly, call :meth:`invalidate`
+    afterwards so the cached properties are recalculated.
+    """
+
+    def __init__(self, linesegs:list = ()):
+        ends = PointArray.from_linesegs(linesegs).xy
+        self.endpoints = np.ascontiguousarray(ends.reshape(-1, 2, 2))
+        self.invalidate()
+
+    @classmethod
+    def from_arrays(cls, starts, ends) -> object:
+        """Alternative SegmentStore definition from S×2 endpoint arrays.
+
+        Example
+        -------
+        >>> SegmentStore.from_arrays([(0,0),(1,1)], [(2,0),(1,3)]).lengths.tolist()
+        [2.0, 2.0]
+        """
+        store = cls()
+        store.endpoints = np.ascontiguousarray(np.stack(
+            (_as_xy(starts).reshape(-1,2), _as_xy(ends).reshape(-1,2)),
+            axis=1
+            ))
+        return store
+
+    def invalidate(self) -> None:
+        """Forget the cached lengths, midpoints and angles."""
+        self._lengths = None
+        self._midpoints = None
+        self._angles = None
+
+    @property
+    def starts(self) -> np.ndarray:
+        """Return the first endpoint of every segment (S×2 view)."""
+        return self.endpoints[:,0]
+
+    @property
+    def ends(self) -> np.ndarray:
+        """Return the second endpoint of every segment (S×2 view)."""
+        return self.endpoints[:,1]
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Return the length of every segment."""
+        if self._lengths is None:
+            d = self.ends - self.starts
+            self._lengths = np.hypot(d[:,0], d[:,1])
+        return self._lengths
+
+    @property
+    def midpoints(self) -> PointArray:
+        """Return the midpoint of every segment."""
+        if self._midpoints is None:
+            self._midpoints = PointArray((self.starts + self.ends)/2)
+        return self._midpoints
+
+    @property
+    def angles(self) -> np.ndarray:
+        """Return the angle of every segment, like :attr:`LineSegment.angle`."""
+        if self._angles is None:
+            d = self.ends - self.starts
+            with np.errstate(divide='ignore', invalid='ignore'):
+                self._angles = np.where(
+                    d[:,0] == 0,
+                    np.copysign(np.pi/2, d[:,1]),
+                    np.arctan(d[:,1]/d[:,0])
+                    )
+        return self._angles
+
+    @property
+    def quadrances(self) -> np.ndarray:
+        """Return the quadrance (length squared) of every segment.
+
+        Cheaper than :attr:`lengths`: no square root.
+        """
+        return PointArray.quadrance(self.starts, self.ends)
+
+    @property
+    def directions(self) -> PointArray:
+        """Return the vector along every segment."""
+        return PointArray(self.ends - self.starts)
+
+    def spreads(self, other) -> np.ndarray:
+        """Return the spread between every segment and `other`.
+
+        `other` is one LineSegment or Line (compared with every
+        segment) or a SegmentStore of the same length (compared
+        segment by segment).
+
+        Example
+        -------
+        >>> store = SegmentStore.from_arrays([(0,0),(0,0)], [(1,1),(0,1)])
+        >>> store.spreads(Line()).tolist()
+        [0.5, 1.0]
+        """
+        return PointArray.spread(self.directions, _direction_xy(other))
+
+    def crosses(self, other) -> np.ndarray:
+        """Return the cross product of every segment and `other`.
+
+        See :meth:`spreads` for what `other` can be.
+        """
+        return PointArray.cross(self.directions, _direction_xy(other))
+
+    def to_linesegs(self) -> list:
+        """Return the segments as a list of FrozenLineSegment."""
+        return [self[i] for i in range(len(self))]
+
+    def __len__(self):
+        return len(self.endpoints)
+
+    def __iter__(self):
+        return iter(self.to_linesegs())
+
+    def __getitem__(self, i:int) -> FrozenLineSegment:
+        (ax, ay), (bx, by) = self.endpoints[i].tolist()
+        return FrozenLineSegment([Point(ax,ay), Point(bx,by)])
+
+    def __setitem__(self, i:int, lineseg) -> None:
+        self.endpoints[i] = lineseg.endpoints
+        self.invalidate()
+
+def _direction_xy(obj) -> np.ndarray:
+    """Return the direction vector(s) of a Line, LineSegment or SegmentStore."""
+    if isinstance(obj, SegmentStore):
+        return obj.ends - obj.starts
+    return _as_xy(obj.direction)
+
 class Line():
     """A line defined by a point and a slope.
 
@@ -346,6 +1094,35 @@ class Line():
         self.point = point
         self.slope = slope
 
+    @property
+    def direction(self) -> Point:
+        """Return the slope as a Point (Δx, Δy)."""
+        return Point(*self.slope)
+
+    def spread(self, other):
+        """Return the spread between this and another Line or LineSegment.
+
+        See :meth:`PointMath.spread`.
+
+        Example
+        -------
+        >>> Line(slope=(1,2)).spread(Line(slope=(2,-1)))
+        Fraction(1, 1)
+        """
+        return PointMath.spread(self.direction, other.direction)
+
+    def cross(self, other):
+        """Return the cross product of this and another Line or LineSegment.
+
+        Zero means parallel. See :meth:`PointMath.cross`.
+
+        Example
+        -------
+        >>> Line(slope=(1,1)).cross(LineSegment([Point(0,0), Point(2,2)]))
+        0
+        """
+        return PointMath.cross(self.direction, other.direction)
+
     def meet(self, lineseg:LineSegment) -> object:
         """Find the point where this line intersects the line segment.
 
@@ -368,10 +1145,19 @@ class Line():
         >>> L.meet(seg)
         Point(x=1.5714285714285714, y=1.5714285714285714)
 
+        A parallel line segment never meets the line:
+        >>> print(L.meet(LineSegment([Point(1,0), Point(2,1)])))
+        None
+
         Return
         ------
         object
             An instance of Point. The intersection point.
+            None if the line and the line segment are parallel.
+
+        See Also
+        --------
+        meet_many : intersect many lines with many line segments.
         """
 
         # rename inputs that define the line
@@ -403,9 +1189,220 @@ class Line():
         #  x = (d/det)k1 - (b/det)k2
 
         det = a*d - b*c
+        if det == 0:
+            # Parallel (or the line segment is a single point)
+            return None
 
         x = ( d/det)*k1  + (-b/det)*k2
         y = (-c/det)*k1  + ( a/det)*k2
 
         return Point(x,y)
 
+    @staticmethod
+    def meet_many(lines:list, linesegs:list, ray:bool = False) -> object:
+        """Find where each line intersects each line segment.
+
+        This is :meth:`meet` for many lines and many line segments at
+        once. It converts the objects to arrays and calls
+        :func:`meet_arrays`. Use :func:`meet_arrays` directly if the
+        geometry is already in arrays.
+
+        Example
+        -------
+        Two lines: a horizontal and a 45° line through the origin.
+        >>> lines = [Line(), Line(slope=(1,1))]
+
+        Two line segments: a vertical and a horizontal.
+        >>> segs = [
+        ...     LineSegment([Point(1,-1), Point(1,1)]),
+        ...     LineSegment([Point(-2,0.5), Point(2,0.5)]),
+        ...     ]
+        >>> hits = Line.meet_many(lines, segs)
+
+        The horizontal line hits the vertical segment, but it is
+        parallel to the horizontal segment:
+        >>> hits.valid.tolist()
+        [[True, False], [True, True]]
+        >>> hits.points[0,0].tolist()
+        [1.0, 0.0]
+        >>> hits.points[1].tolist()
+        [[1.0, 1.0], [0.5, 0.5]]
+
+        Parameters
+        ----------
+        lines
+            List of Line.
+        linesegs
+            List of LineSegment.
+        ray
+            If True, treat each line as a ray that starts at its
+            ``point`` and goes in the direction of its ``slope``.
+
+        Return
+        ------
+        object
+            An instance of :class:`Intersections`. See
+            :func:`meet_arrays`.
+        """
+        origins = np.array([L.point for L in lines], dtype=np.float64)
+        slopes = np.array([L.slope for L in lines], dtype=np.float64)
+        ends = PointArray.from_linesegs(linesegs).xy
+        return meet_arrays(origins, slopes, ends[0::2], ends[1::2], ray)
+
+Intersections = namedtuple('Intersections', ['points', 't', 'u', 'valid'])
+Intersections.__doc__ = """Result of intersecting R lines with S line segments.
+
+points
+    R×S×2 array of intersection points. NaN where not ``valid``.
+t
+    R×S array. Distance along each line, in units of its slope:
+    ``point = origin + t*slope``. NaN where parallel.
+u
+    R×S array. Fraction of the way along each line segment, from the
+    first endpoint (u=0) to the second endpoint (u=1). NaN where
+    parallel.
+valid
+    R×S bool array. False where the line is parallel to the line
+    segment, where the intersection is outside the line segment, or
+    (for rays) where the intersection is behind the ray origin.
+"""
+
+def meet_arrays(origins, slopes, starts, ends, ray:bool = False) -> Intersections:
+    """Intersect every line with every line segment, vectorized.
+
+    Every line is tested against every line segment with NumPy array
+    operations instead of calling :meth:`Line.meet` once per pair.
+
+    Example
+    -------
+    Three rays leaving the origin: right, up, and left.
+    >>> origins = [(0,0)]*3
+    >>> slopes = [(1,0), (0,1), (-1,0)]
+
+    One vertical wall at x=2 from y=-1 to y=1.
+    >>> hits = meet_arrays(origins, slopes, [(2,-1)], [(2,1)], ray=True)
+
+    Only the first ray hits the wall. The second ray is parallel to
+    the wall and the third ray points away from it.
+    >>> hits.valid[:,0].tolist()
+    [True, False, False]
+    >>> hits.points[0,0].tolist()
+    [2.0, 0.0]
+    >>> hits.t[:,0].tolist()
+    [2.0, nan, -2.0]
+    >>> hits.u[0,0].item()
+    0.5
+
+    Parameters
+    ----------
+    origins, slopes
+        R×2 arrays. Line ``i`` passes through ``origins[i]`` with
+        slope ``slopes[i]`` (Δx, Δy). A PointArray works too.
+    starts, ends
+        S×2 arrays. Line segment ``j`` goes from ``starts[j]`` to
+        ``ends[j]``.
+    ray
+        If True, a line only hits what is in front of it (t ≥ 0).
+
+    Return
+    ------
+    Intersections
+        ``points``, ``t``, ``u`` and ``valid`` as R×S arrays.
+    """
+    P = _as_xy(origins)[:,np.newaxis,:]       # R×1×2
+    D = _as_xy(slopes)[:,np.newaxis,:]        # R×1×2
+    A = _as_xy(starts)[np.newaxis,:,:]        # 1×S×2
+    E = _as_xy(ends)[np.newaxis,:,:] - A      # 1×S×2
+    W = A - P                                 # R×S×2
+
+    # Solve P + tD = A + uE for t and u with 2D cross products:
+    #   t = (W × E) / (D × E)
+    #   u = (W × D) / (D × E)
+    det = D[...,0]*E[...,1] - D[...,1]*E[...,0]
+    parallel = det == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inv = np.where(parallel, np.nan, 1/np.where(parallel, 1, det))
+    t = (W[...,0]*E[...,1] - W[...,1]*E[...,0])*inv
+    u = (W[...,0]*D[...,1] - W[...,1]*D[...,0])*inv
+
+    valid = ~parallel & (u >= 0) & (u <= 1)
+    if ray:
+        valid &= t >= 0
+    points = P + t[...,np.newaxis]*D
+    points[~valid] = np.nan
+    return Intersections(points, t, u, valid)
+
+def _clip_t(a:Point, b:Point, rect:tuple) -> tuple:
+    """Liang–Barsky: return (t0, t1), the part of a→b inside rect, or None."""
+    xmin, ymin, xmax, ymax = rect
+    dx = b.x - a.x; dy = b.y - a.y
+    t0 = 0; t1 = 1
+    for p, q in (
+            (-dx, a.x - xmin), (dx, xmax - a.x),
+            (-dy, a.y - ymin), (dy, ymax - a.y)
+            ):
+        if p == 0:
+            if q < 0:
+                return None # parallel to this edge and outside it
+        elif p < 0:
+            t0 = max(t0, q/p)
+        else:
+            t1 = min(t1, q/p)
+    if t0 > t1:
+        return None
+    return t0, t1
+
+Clipped = namedtuple('Clipped', ['starts', 'ends', 't0', 't1', 'keep'])
+Clipped.__doc__ = """Result of clipping S line segments to a rectangle.
+
+starts, ends
+    S×2 arrays. The clipped endpoints. Rows where ``keep`` is False
+    are meaningless.
+t0, t1
+    Length-S arrays. The clipped segment runs from fraction ``t0`` to
+    fraction ``t1`` of the way along the original segment.
+    ``t0 > 0`` or ``t1 < 1`` means that end was clipped.
+keep
+    Length-S bool array. False where the segment is entirely outside
+    the rectangle.
+"""
+
+def clip_arrays(starts, ends, rect:tuple) -> Clipped:
+    """Clip many line segments to a rectangle, vectorized.
+
+    Batch version of :meth:`LineSegment.clip` (Liang–Barsky).
+
+    Example
+    -------
+    >>> c = clip_arrays([(-10,0), (0,0), (5,5)], [(10,0), (0.5,0.5), (6,6)], (-1,-1,1,1))
+    >>> c.keep.tolist()
+    [True, True, False]
+    >>> c.starts[:2].tolist(), c.ends[:2].tolist()
+    ([[-1.0, 0.0], [0.0, 0.0]], [[1.0, 0.0], [0.5, 0.5]])
+    >>> c.t0[:2].tolist(), c.t1[:2].tolist()
+    ([0.45, 0.0], [0.55, 1.0])
+
+    Parameters
+    ----------
+    starts, ends
+        S×2 arrays. Segment ``i`` goes from ``starts[i]`` to ``ends[i]``.
+    rect
+        (xmin, ymin, xmax, ymax)
+    """
+    A = _as_xy(starts).reshape(-1, 2)
+    B = _as_xy(ends).reshape(-1, 2)
+    xmin, ymin, xmax, ymax = rect
+    d = B - A
+    t0 = np.zeros(len(A)); t1 = np.ones(len(A))
+    keep = np.ones(len(A), dtype=bool)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for p, q in (
+                (-d[:,0], A[:,0] - xmin), (d[:,0], xmax - A[:,0]),
+                (-d[:,1], A[:,1] - ymin), (d[:,1], ymax - A[:,1])
+                ):
+            r = q/p
+            keep &= ~((p == 0) & (q < 0))
+            np.maximum(t0, np.where(p < 0, r, 0), out=t0)
+            np.minimum(t1, np.where(p > 0, r, 1), out=t1)
+    keep &= t0 <= t1
+    return Clipped(A + t0[:,np.newaxis]*d, A + t1[:,np.newaxis]*d, t0, t1, keep)
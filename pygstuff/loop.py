@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Run the simulation and the drawing at the same time.
+
+The usual game loop is serial: events, update, draw, flip. If the
+update is heavy (e.g., tracing thousands of rays), drawing waits for
+it, and it waits for drawing. A :class:`Runner` moves the updates to a
+worker thread (or process). Each update returns a new snapshot of the
+simulation state. The worker publishes it to a :class:`Snapshots`
+double buffer, and the main thread draws the latest snapshot that is
+complete, while the worker is already computing the next one.
+
+Snapshots must not change once they are published: the main thread
+may be drawing one while the worker makes the next. Return a new
+object from ``update``, do not modify the old one.
+"""
+
+import queue
+import threading
+import multiprocessing
+import time
+import pygame
+from . import user
+
+class Snapshots(object):
+    """Double buffer of simulation snapshots.
+
+    The worker builds the next snapshot on its own (the back buffer)
+    and publish() swaps it in. The renderer reads the front buffer
+    with latest(). Swapping is a reference assignment under a lock,
+    so neither side ever waits for the other to finish its work.
+
+    Example
+    -------
+    >>> snapshots = Snapshots('first')
+    >>> snapshots.latest()
+    (0, 'first')
+    >>> snapshots.publish('second')
+    >>> snapshots.latest()
+    (1, 'second')
+    """
+
+    def __init__(self, snapshot=None):
+        self._lock = threading.Lock()
+        self._front = snapshot
+        self._number = 0
+        self._published = threading.Condition(self._lock)
+
+    def publish(self, snapshot):
+        """Make `snapshot` the latest completed snapshot."""
+        with self._lock:
+            self._front = snapshot
+            self._number += 1
+            self._published.notify_all()
+
+    def latest(self):
+        """Return (number, snapshot) of the latest completed snapshot."""
+        with self._lock:
+            return self._number, self._front
+
+    def wait(self, after, timeout=None):
+        """Wait for a snapshot newer than number `after`. Return latest()."""
+        with self._lock:
+            self._published.wait_for(lambda: self._number > after, timeout)
+            return self._number, self._front
+
+class Runner(object):
+    """Game loop with the updates on a worker and drawing on the main thread.
+
+    Example
+    -------
+    A ball moving at 100 pixels per second:
+    >>> import pygstuff as pygs
+    >>> win = pygs.Window(headless=True)
+    >>> win.open_window(200, 100)
+    >>> def update(x, dt, messages):
+    ...     return x + 100*dt
+    >>> def render(x, window):
+    ...     _ = window.surface.fill((0,0,0))
+    ...     _ = pygame.draw.circle(window.surface, (255,255,255), (int(x) % 200, 50), 5)
+    >>> runner = Runner(win, pygs.Clock(framerate=100), update, render, state=0.0)
+    >>> runner.run(frames=10)
+    >>> runner.frames
+    10
+    >>> runner.updates > 0
+    True
+
+    With the clock timing on, drawing and simulation are timed apart:
+    >>> clock = pygs.Clock(framerate=100, timing=True)
+    >>> Runner(win, clock, update, render, state=0.0).run(frames=10)
+    >>> sorted(clock.stats()['phases'])
+    ['events', 'flip', 'render', 'update']
+
+    Parameters
+    ----------
+    window
+        A pygstuff Window (headless is fine).
+    clock
+        A pygstuff Clock. It holds the framerate of the drawing. Turn
+        on its timing to see the 'events', 'render' and 'flip'
+        (display) phases in clock.stats(), and with a thread worker
+        also 'update', the time each simulation update takes.
+    update
+        ``update(state, dt, messages) -> state``. Called on the
+        worker every `dt` seconds of simulated time. `messages` is
+        the list of everything passed to :meth:`send` since the last
+        update. Return the next state, a new object.
+    render
+        ``render(state, window)``. Called on the main thread once per
+        frame with the latest completed state.
+    state
+        The first state. It is drawn until the first update is done.
+    rate
+        Updates per second. Default is the clock framerate. dt is
+        1/rate.
+    on_event
+        ``on_event(event)`` for each pygame event, on the main thread.
+        Whatever it returns (other than None) is sent to the
+        simulation with :meth:`send`. The loop quits on the events
+        :func:`pygstuff.user.quit` quits on.
+    process
+        If True, run the updates in a separate process instead of a
+        thread, so they do not compete for the GIL with drawing.
+        `update` and `state` must be picklable (a module-level
+        function, plain data).
+    """
+
+    def __init__(self, window, clock, update, render, state,
+            rate=None, on_event=None, process=False):
+        self.window = window
+        self.clock = clock
+        self.update = update
+        self.render = render
+        self.rate = rate or clock._framerate
+        self.on_event = on_event
+        self.process = process
+        self.snapshots = Snapshots(state)
+        self.frames = 0 # frames drawn by the last run()
+        self._state = state
+        self._error = None
+        if process:
+            self._context = multiprocessing.get_context('spawn')
+            self._inbox = self._context.Queue()
+        else:
+            self._inbox = queue.Queue()
+
+    @property
+    def updates(self):
+        """Number of updates completed."""
+        return self.snapshots.latest()[0]
+
+    def send(self, message):
+        """Pass `message` to the next update."""
+        self._inbox.put(message)
+
+    def run(self, frames=None):
+        """Run the loop until the user quits, or for `frames` frames."""
+        self._start()
+        self.frames = 0
+        try:
+            quit = False
+            while not quit and (frames is None or self.frames < frames):
+                self.clock.tick()
+                with self.clock.phase('events'):
+                    quit = self._events()
+                with self.clock.phase('render'):
+                    self.render(self.snapshots.latest()[1], self.window)
+                with self.clock.phase('flip'):
+                    self.window.update()
+                self.frames += 1
+                self._check()
+        finally:
+            self._stop()
+        # Pick up where this run stopped, if run() is called again
+        self._state = self.snapshots.latest()[1]
+        self._check()
+
+    def _events(self):
+        '''Handle the pygame events. Return True to quit.'''
+        quit = False
+        for event in pygame.event.get():
+            kp = pygame.key.get_pressed()
+            km = pygame.key.get_mods()
+            if user.quit(event, kp, km):
+                quit = True
+            elif self.on_event is not None:
+                message = self.on_event(event)
+                if message is not None:
+                    self.send(message)
+        return quit
+
+    def _start(self):
+        if self.process:
+            context = self._context
+            self._outbox = context.Queue(maxsize=2)
+            self._halt = context.Event()
+            self._worker = context.Process(
+                target=_simulate,
+                args=(self.update, self._state, 1/self.rate,
+                      self._inbox, self._outbox.put, self._halt),
+                daemon=True
+                )
+            # The receiver moves snapshots from the process to the
+            # double buffer, so the worker never waits for drawing.
+            self._receiver = threading.Thread(target=self._receive, daemon=True)
+            self._receiver.start()
+        else:
+            self._halt = threading.Event()
+            self._worker = threading.Thread(target=self._simulate_thread, daemon=True)
+        self._worker.start()
+
+    def _simulate_thread(self):
+        try:
+            _simulate(self.update, self._state, 1/self.rate,
+                      self._inbox, self.snapshots.publish, self._halt,
+                      timer=lambda: self.clock.phase('update'))
+        except BaseException as e:
+            self._error = e
+
+    def _receive(self):
+        while True:
+            snapshot = self._outbox.get()
+            if isinstance(snapshot, _Done):
+                return
+            self.snapshots.publish(snapshot)
+
+    def _stop(self):
+        self._halt.set()
+        self._worker.join()
+        if self.process:
+            if self._worker.exitcode:
+                self._error = RuntimeError(
+                    f"simulation process exited with code {self._worker.exitcode}"
+                    )
+            self._outbox.put(_Done())
+            self._receiver.join()
+
+    def _check(self):
+        if (self.process and self._error is None
+                and not self._halt.is_set() and not self._worker.is_alive()):
+            # The update raised in the process: stop now, not at quit.
+            self._error = RuntimeError(
+                f"simulation process exited with code {self._worker.exitcode}"
+                )
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("simulation update failed") from error
+
+class _Done(object):
+    '''End of the snapshots from a simulation process.'''
+
+def _simulate(update, state, dt, inbox, publish, halt, timer=None):
+    '''Call update every dt seconds until halt is set. Publish each state.
+
+    `timer`, if given, returns a context manager that times an update
+    (e.g., a Clock phase).
+    '''
+    next_time = time.perf_counter()
+    while not halt.is_set():
+        messages = []
+        while True:
+            try:
+                messages.append(inbox.get_nowait())
+            except queue.Empty:
+                break
+        if timer is None:
+            state = update(state, dt, messages)
+        else:
+            with timer():
+                state = update(state, dt, messages)
+        publish(state)
+        next_time += dt
+        wait = next_time - time.perf_counter()
+        if wait > 0:
+            halt.wait(wait)
+        else:
+            next_time = time.perf_counter() # fell behind: do not try to catch up
+
+if __name__ == '__main__':
+    import doctest
+    print(doctest.testmod())
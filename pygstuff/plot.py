@@ -2,13 +2,21 @@
 # -*- coding: utf-8 -*-
 '''plot stuff
 get_data(filepath, col) -> list
+iter_blocks(filepath, cols, chunk_size) -> iterator of numpy arrays
+load_columns(filepath, cols, cache) -> tuple of numpy arrays
+Follower(filepath, cols) -> reads the lines appended to a data file
 scale_data_to_fit(data, size) -> list
+RingSeries(capacity) -> last `capacity` values, with min/max and scaled()
 
 TODO
 ----
 [ ] finish moving plotting stuff from $games/plot-1d.py
 '''
 
+from collections import deque
+import json
+import os
+import numpy as np
 import pygame
 
 def _strings_from_data_columns(filepath) -> list:
@@ -54,6 +62,412 @@ def _strings_from_data_columns(filepath) -> list:
         # Unzip the data into a tuple for each column.
         return tuple(zip(*iter(data)))
 
+def iter_blocks(filepath, cols=None, chunk_size=1<<20, dtype=np.float64):
+    '''Read the data file in chunks. Yield each chunk as a float array.
+
+    The file is never in memory all at once: each chunk is about
+    `chunk_size` bytes of text, so peak memory is proportional to
+    `chunk_size`, not to the file size.
+
+    Parameters
+    ----------
+    filepath: path to data file, same format as for get_data()
+    cols: (int or list of int) the columns to read, default is all
+        the columns of the first data line
+    chunk_size: (int) bytes of the file to parse at a time
+    dtype: numpy float type of the blocks, default float64
+
+    Blank lines are skipped. A line with fewer columns than asked
+    for, or an empty value, gives NaN. A column that no data line
+    has raises IndexError, after the last block.
+
+    Yields
+    ------
+    numpy.ndarray
+        rows×columns float array, the rows of one chunk, in the order
+        of `cols`. block[:,i] is a block of column cols[i].
+
+    Example
+    -------
+    Write a small data file.
+    >>> import tempfile, os
+    >>> fd, filepath = tempfile.mkstemp(suffix='.txt')
+    >>> with os.fdopen(fd, 'w') as f:
+    ...     _ = f.write('# x\\ty\\n')
+    ...     for i in range(10000):
+    ...         _ = f.write(f'{i}\\t{i*i}\\n')
+
+    Read it in blocks of about 16 kB.
+    >>> blocks = list(iter_blocks(filepath, cols=[1], chunk_size=1<<14))
+    >>> len(blocks) > 1
+    True
+    >>> blocks[0].shape[1]
+    1
+    >>> y = np.concatenate(blocks)[:,0]
+    >>> len(y), float(y[-1])
+    (10000, 99980001.0)
+
+    There is no column 2:
+    >>> list(iter_blocks(filepath, cols=[0, 2])) # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+    ...
+    IndexError: column 2 is not in any data line of ... (at most 2 columns)
+    >>> os.remove(filepath)
+    '''
+    usecols = [cols] if isinstance(cols, int) else cols
+    widest = 0 # columns of the widest data line (at least of usecols)
+    with open(filepath) as datafile:
+        while True:
+            lines = datafile.readlines(chunk_size) # whole lines, about chunk_size bytes
+            if not lines:
+                break
+            block, usecols, width = _parse_lines(lines, usecols, dtype)
+            if block is not None:
+                widest = max(widest, width)
+                yield block
+    if widest:
+        _check_columns(usecols, widest, filepath)
+
+def _check_columns(usecols, widest, filepath) -> None:
+    '''Raise IndexError if a column is past the widest data line.'''
+    missing = [col for col in usecols if col >= widest]
+    if missing:
+        raise IndexError(
+            f"column {missing[0]} is not in any data line of {filepath} "
+            f"(at most {widest} columns)"
+            )
+
+def _parse_lines(lines, usecols, dtype) -> tuple:
+    '''Parse lines of a data file. Return (block, usecols, width).
+
+    Comment and blank lines are skipped. block is the rows×columns
+    array, or None if there are no data lines. If `usecols` is None,
+    it becomes all the columns of the first data line. width is the
+    number of columns of the widest line, or at least of the columns
+    in `usecols` if every line has them all.
+    '''
+    lines = [
+        line for line in lines
+        if not line.startswith('#') and line.strip()
+        ]
+    if not lines:
+        return None, usecols, 0
+    if usecols is None:
+        # All columns: as many as the first data line has
+        usecols = list(range(len(lines[0].rstrip('\n').split('\t'))))
+    try:
+        block = np.loadtxt(
+            lines, delimiter='\t', comments=None,
+            usecols=usecols, ndmin=2, dtype=dtype
+            )
+        width = max(usecols) + 1
+    except ValueError:
+        block, width = _parse_ragged(lines, usecols, dtype)
+    return block, usecols, width
+
+def _parse_ragged(lines, usecols, dtype) -> tuple:
+    '''Slow path of iter_blocks for lines with missing or empty values.
+
+    Return (block, width): width is the widest line's number of
+    columns.
+    '''
+    block = np.full((len(lines), len(usecols)), np.nan, dtype=dtype)
+    width = 0
+    for i, line in enumerate(lines):
+        values = line.rstrip('\n').split('\t')
+        width = max(width, len(values))
+        for j, col in enumerate(usecols):
+            if col < len(values) and values[col].strip():
+                block[i,j] = float(values[col])
+    return block, width
+
+def load_columns(filepath, cols=None, dtype=np.float64, chunk_size=1<<20,
+        cache=False) -> tuple:
+    '''Return the data columns of a data file as numpy arrays.
+
+    The file is read and parsed once, whatever the number of columns,
+    and never held in memory as text (see iter_blocks()). Use this
+    instead of calling get_data() once per column.
+
+    Parameters
+    ----------
+    filepath: path to data file, same format as for get_data()
+    cols: (int or list of int) the columns to load, default is all
+    dtype: np.float64 (default) or np.float32 to halve the memory
+    chunk_size: (int) bytes of the file to parse at a time
+    cache: if True, keep the parsed columns in a binary file next to
+        the data file (see _cache_paths()) and memory-map that file on
+        the next load instead of parsing the text again. The cache is
+        remade when the size or modification time of the data file
+        changes, or for a different dtype.
+
+    Return
+    ------
+    tuple of numpy.ndarray, one 1D array per column in `cols`
+    (read-only numpy.memmap views into the cache file if `cache`)
+
+    Example
+    -------
+    A data file with a comment, a blank line and a short line.
+    >>> import tempfile, os
+    >>> fd, filepath = tempfile.mkstemp(suffix='.txt')
+    >>> with os.fdopen(fd, 'w') as f:
+    ...     _ = f.write('# t\\tx\\ty\\n0\\t1.5\\t2\\n\\n1\\t2.5\\t3\\n2\\t3.5\\n')
+
+    Load x and y with one pass over the file.
+    >>> x, y = load_columns(filepath, cols=[1, 2])
+    >>> x
+    array([1.5, 2.5, 3.5])
+    >>> y
+    array([ 2.,  3., nan])
+
+    No data line has a column 3:
+    >>> load_columns(filepath, cols=[1, 3]) # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+    ...
+    IndexError: column 3 is not in any data line of ... (at most 3 columns)
+
+    All columns, as float32.
+    >>> t, x, y = load_columns(filepath, dtype=np.float32)
+    >>> t.dtype
+    dtype('float32')
+
+    With the cache, the first load parses the text and saves the
+    columns. The next load maps the saved columns, no parsing.
+    >>> x, y = load_columns(filepath, cols=[1, 2], cache=True)
+    >>> x, y = load_columns(filepath, cols=[1, 2], cache=True)
+    >>> isinstance(x, np.memmap), x.tolist()
+    (True, [1.5, 2.5, 3.5])
+
+    Changing the data file invalidates the cache.
+    >>> with open(filepath, 'a') as f:
+    ...     _ = f.write('3\\t4.5\\t5\\n')
+    >>> x, y = load_columns(filepath, cols=[1, 2], cache=True)
+    >>> x.tolist()
+    [1.5, 2.5, 3.5, 4.5]
+
+    The cache never changes the result, or the error:
+    >>> all(
+    ...     np.array_equal(a, b, equal_nan=True) for a, b in
+    ...     zip(load_columns(filepath, cache=True), load_columns(filepath))
+    ...     )
+    True
+    >>> load_columns(filepath, cols=3, cache=True) # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+    ...
+    IndexError: column 3 is not in any data line of ... (at most 3 columns)
+    >>> for path in (filepath, *_cache_paths(filepath)):
+    ...     os.remove(path)
+    '''
+    if cache:
+        data = _load_cached(filepath, dtype, chunk_size)
+        usecols = [cols] if isinstance(cols, int) else cols
+        if data is not None and (cols is None or max(usecols, default=-1) < len(data)):
+            return tuple(data) if cols is None else tuple(data[col] for col in usecols)
+        # The cache has the columns of the first data line. Any other
+        # column is looked for (and missing columns reported) by the
+        # same parse as without the cache.
+    blocks = list(iter_blocks(filepath, cols, chunk_size, dtype))
+    if not blocks:
+        n = 1 if isinstance(cols, int) else len(cols or [])
+        return tuple(np.empty(0, dtype=dtype) for _ in range(n))
+    data = np.concatenate(blocks)
+    return tuple(np.ascontiguousarray(data[:,j]) for j in range(data.shape[1]))
+
+def _cache_paths(filepath) -> tuple:
+    '''Return the paths of the cache of data file `filepath`.
+
+    - ``<filepath>.cols.npy``: the columns, one row per column, so
+      each column is contiguous in the file
+    - ``<filepath>.cols.json``: the size, modification time and dtype
+      of the data file the columns were parsed from
+    '''
+    filepath = os.fspath(filepath)
+    return filepath + '.cols.npy', filepath + '.cols.json'
+
+def _load_cached(filepath, dtype, chunk_size):
+    '''Return the columns×rows array of `filepath`, memory-mapped.
+
+    Parse the data file and save the cache first if there is no valid
+    cache. Return None if the data file has no data.
+    '''
+    columns_path, key_path = _cache_paths(filepath)
+    stat = os.stat(filepath)
+    key = {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'dtype': np.dtype(dtype).str,
+        }
+    try:
+        with open(key_path) as f:
+            valid = json.load(f) == key
+    except (OSError, ValueError):
+        valid = False
+    if valid:
+        try:
+            return np.load(columns_path, mmap_mode='r')
+        except (OSError, ValueError):
+            pass # missing or damaged: parse again
+    blocks = list(iter_blocks(filepath, None, chunk_size, dtype))
+    if not blocks:
+        return None
+    data = np.ascontiguousarray(np.concatenate(blocks).T)
+    try:
+        # Write to temporary files and rename, so a load that happens
+        # at the same time never sees half a cache.
+        with open(columns_path + '.tmp', 'wb') as f:
+            np.save(f, data)
+        os.replace(columns_path + '.tmp', columns_path)
+        with open(key_path + '.tmp', 'w') as f:
+            json.dump(key, f)
+        os.replace(key_path + '.tmp', key_path)
+    except OSError:
+        return data # cannot write next to the data file: no cache
+    return np.load(columns_path, mmap_mode='r')
+
+class Follower(object):
+    '''Follow a data file that is still being written, like ``tail -F``.
+
+    Each poll() reads only the complete lines appended since the last
+    poll and adds them to the columns in memory. The lines already
+    read are never read or parsed again.
+
+    Example
+    -------
+    An instrument writes a header, two lines and half of a third.
+    >>> import tempfile, os
+    >>> fd, filepath = tempfile.mkstemp(suffix='.txt')
+    >>> with os.fdopen(fd, 'w') as f:
+    ...     _ = f.write('# t\\ty\\n0\\t10\\n1\\t11\\n2\\t1')
+    >>> follower = Follower(filepath, cols=[0, 1])
+    >>> follower.poll()
+    2
+    >>> t, y = follower.columns
+    >>> y.tolist()
+    [10.0, 11.0]
+
+    The half line is read once it is complete.
+    >>> with open(filepath, 'a') as f:
+    ...     _ = f.write('2\\n3\\t13\\n')
+    >>> follower.poll()
+    2
+    >>> follower.columns[1].tolist()
+    [10.0, 11.0, 12.0, 13.0]
+    >>> follower.poll()
+    0
+
+    The instrument starts a new file (the old one is truncated or
+    renamed). The follower reads the new file from its start and
+    keeps the columns it has, unless told to clear() them.
+    >>> with open(filepath, 'w') as f:
+    ...     _ = f.write('0\\t20\\n')
+    >>> follower.poll()
+    1
+    >>> follower.restarts, len(follower)
+    (1, 5)
+    >>> follower.clear()
+    >>> len(follower)
+    0
+    >>> os.remove(filepath)
+
+    Parameters
+    ----------
+    filepath: path to the data file, same format as for get_data().
+        The file does not need to exist yet.
+    cols: (int or list of int) the columns to keep, default is all the
+        columns of the first data line
+    dtype: np.float64 (default) or np.float32
+    chunk_size: (int) most bytes read and parsed at a time
+
+    A new file is noticed when the path names a different file than
+    before (rotation) or when the file is shorter than what was
+    already read (truncation). A file that is truncated and then grows
+    past the old length before the next poll() looks like appended
+    data.
+
+    The file is opened only during poll(), so the instrument is free
+    to rename or delete it (on Windows an open file cannot be).
+    '''
+
+    def __init__(self, filepath, cols=None, dtype=np.float64, chunk_size=1<<20):
+        self.filepath = filepath
+        self.dtype = dtype
+        self.chunk_size = chunk_size
+        self.restarts = 0 # number of times the file was rotated or truncated
+        self._usecols = [cols] if isinstance(cols, int) else cols
+        self._offset = 0  # bytes read so far: the end of the last complete line
+        self._file_id = None
+        self._data = None # columns×capacity, grows by doubling
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def columns(self) -> tuple:
+        '''The rows read so far: one 1D array per column.
+
+        The arrays are views into the follower's buffer: copy them to
+        keep them past the next poll().
+        '''
+        if self._data is None:
+            n = 0 if self._usecols is None else len(self._usecols)
+            return tuple(np.empty(0, dtype=self.dtype) for _ in range(n))
+        return tuple(self._data[:, :self._length])
+
+    def clear(self):
+        '''Forget the rows read so far. Keep reading from where it is.'''
+        self._length = 0
+
+    def poll(self) -> int:
+        '''Read the complete lines appended to the file. Return how many
+        rows were added.'''
+        try:
+            stat = os.stat(self.filepath)
+        except FileNotFoundError:
+            return 0 # not created yet, or between rotations
+        file_id = (stat.st_dev, stat.st_ino)
+        if self._file_id is not None and (
+                file_id != self._file_id or stat.st_size < self._offset):
+            self._offset = 0
+            self.restarts += 1
+        self._file_id = file_id
+        if stat.st_size == self._offset:
+            return 0
+        added = 0
+        with open(self.filepath, 'rb') as datafile:
+            datafile.seek(self._offset)
+            pending = b''
+            while True:
+                chunk = datafile.read(self.chunk_size)
+                if not chunk:
+                    break
+                pending += chunk
+                end = pending.rfind(b'\n') + 1
+                if end == 0:
+                    continue # no complete line yet
+                # A partial last line stays in the file for the next poll.
+                lines = pending[:end].decode().splitlines()
+                pending = pending[end:]
+                self._offset += end
+                block, self._usecols, _ = _parse_lines(lines, self._usecols, self.dtype)
+                if block is not None:
+                    self._append(block)
+                    added += len(block)
+        return added
+
+    def _append(self, block):
+        '''Add the rows of a rows×columns block to the buffer.'''
+        needed = self._length + len(block)
+        if self._data is None or needed > self._data.shape[1]:
+            capacity = max(needed, 2*self._length, 1024)
+            data = np.empty((block.shape[1], capacity), dtype=self.dtype)
+            if self._data is not None:
+                data[:, :self._length] = self._data[:, :self._length]
+            self._data = data
+        self._data[:, self._length:needed] = block.T
+        self._length = needed
+
 def get_data(filepath, col=0) -> list:
     '''Return data in column number `col` as a list of floating point values.
 
@@ -62,6 +476,8 @@ def get_data(filepath, col=0) -> list:
     filepath: (pathlib.Path) path to data file
     col: (int) the column number
 
+    Raises IndexError if no data line has column `col`.
+
     Example
     -------
     Get a path to the data file.
@@ -98,9 +514,7 @@ def get_data(filepath, col=0) -> list:
     >>> type(max(y))
     <class 'float'>
     '''
-    data = _strings_from_data_columns(filepath)
-    floats = (float(x) for x in data[col])
-    return list(iter(floats))
+    return load_columns(filepath, col)[0].tolist()
 
 def scale_data_to_fit(data, size) -> list:
     '''Autoscale data to dimension "size" in pixels.
@@ -148,6 +562,129 @@ def scale_data_to_fixed_yrange(data, size, yrange):
     scale = size/yrange
     return [ val*scale for val in data ]
 
+class RingSeries(object):
+    '''The last `capacity` values of a series, for a scrolling strip chart.
+
+    Appending is O(1) and so are min and max: they are kept up to date
+    with two monotonic deques instead of searching the whole window
+    each frame like scale_data_to_fit() does. The values are a view
+    into the buffer, oldest first, never a copy.
+
+    Example
+    -------
+    >>> series = RingSeries(4)
+    >>> series.extend([3, 1, 4, 1, 5])
+    >>> series.values
+    array([1., 4., 1., 5.])
+    >>> series.min, series.max
+    (1.0, 5.0)
+
+    The 4 leaves the window, so the max is the new value.
+    >>> for v in [0, 2, 2]:
+    ...     series.append(v)
+    >>> series.values
+    array([5., 0., 2., 2.])
+    >>> series.append(3)
+    >>> series.min, series.max
+    (0.0, 3.0)
+
+    Scale to fit 300 pixels, like scale_data_to_fit(), into a buffer
+    made once and reused every frame.
+    >>> pixels = np.empty(series.capacity)
+    >>> series.scaled(300, out=pixels)
+    array([  0., 200., 200., 300.])
+
+    Parameters
+    ----------
+    capacity: (int) number of values kept
+    dtype: np.float64 (default) or np.float32
+
+    NaN values are kept in the series but ignored by min and max.
+    min and max are the values as stored, e.g. rounded to float32:
+    >>> series = RingSeries(3, np.float32)
+    >>> series.append(0.1)
+    >>> series.max == float(series.values.max())
+    True
+    '''
+
+    def __init__(self, capacity, dtype=np.float64):
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, not {capacity}")
+        self.capacity = capacity
+        # Each value is written twice, at i and i + capacity, so the
+        # window is always the contiguous slice _buffer[start:start+n].
+        self._buffer = np.zeros(2*capacity, dtype=dtype)
+        self._count = 0     # values appended, ever
+        self._maxima = deque() # (index, value), values decreasing
+        self._minima = deque() # (index, value), values increasing
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    def append(self, value):
+        '''Add `value`. Drop the oldest value if the series is full.'''
+        # Cast once: min and max are then exactly values in the buffer.
+        value = self._buffer.dtype.type(value)
+        i = self._count
+        j = i % self.capacity
+        self._buffer[j] = self._buffer[j + self.capacity] = value
+        self._count += 1
+        value = float(value)
+        if value == value: # not NaN
+            maxima, minima = self._maxima, self._minima
+            while maxima and maxima[-1][1] <= value:
+                maxima.pop()
+            maxima.append((i, value))
+            while minima and minima[-1][1] >= value:
+                minima.pop()
+            minima.append((i, value))
+        oldest = self._count - self.capacity
+        for extremes in (self._maxima, self._minima):
+            if extremes and extremes[0][0] < oldest:
+                extremes.popleft()
+
+    def extend(self, values):
+        '''Append each of `values`.'''
+        for value in values:
+            self.append(value)
+
+    @property
+    def values(self) -> np.ndarray:
+        '''The values in the window, oldest first: a view, not a copy.'''
+        start = max(0, self._count - self.capacity) % self.capacity
+        return self._buffer[start:start + len(self)]
+
+    @property
+    def max(self) -> float:
+        '''Largest value in the window (NaN if there is none).'''
+        return self._maxima[0][1] if self._maxima else float('nan')
+
+    @property
+    def min(self) -> float:
+        '''Smallest value in the window (NaN if there is none).'''
+        return self._minima[0][1] if self._minima else float('nan')
+
+    def scale(self, size) -> float:
+        '''Return the factor that fits the window to `size` pixels.
+
+        Same as in scale_data_to_fit(), except that a flat window
+        (max == min) is not scaled: the factor is 1.0.
+        '''
+        span = self.max - self.min
+        return size/span if span > 0 else 1.0
+
+    def scaled(self, size, out=None) -> np.ndarray:
+        '''Return the values times scale(size).
+
+        Pass an array of at least `capacity` values as `out` to reuse
+        it instead of making a new array each frame. The result is a
+        view of `out`.
+        '''
+        values = self.values
+        if out is not None:
+            out = out[:len(values)]
+        return np.multiply(values, self.scale(size), out=out)
+
 if __name__ == '__main__':
     import doctest
     print(doctest.testmod())
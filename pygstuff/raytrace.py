@@ -0,0 +1,558 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Cast rays into a scene of line segments.
+
+Like :mod:`pygstuff.geometry`, this has nothing to do with pygame.
+It is the ray casting half of my ray-tracing applications: the scene
+is a list of :class:`~pygstuff.geometry.LineSegment` (the walls) and
+a ray is a :class:`~pygstuff.geometry.Line` that starts at its
+``point`` and goes in the direction of its ``slope``.
+
+Testing every ray against every wall is O(rays × walls). The
+:class:`SegmentGrid` bins the walls into a uniform grid so a ray only
+tests the walls in the cells it passes through.
+
+The :class:`Tracer` casts a fan of rays from a source and reflects
+them off the walls. Its output is a list of polylines for
+:func:`pygstuff.draw_geometry.draw_connect_points`.
+"""
+
+from collections import namedtuple
+import math
+import numpy as np
+from .geometry import Point, Line, PointArray, meet_arrays, _as_xy
+
+# ---------------------
+# | Nearest-hit query |
+# ---------------------
+
+Hit = namedtuple('Hit', ['point', 't', 'index'])
+Hit.__doc__ = """The first line segment a ray hits.
+
+point
+    The Point where the ray hits the line segment.
+t
+    Distance along the ray, in units of its slope:
+    ``point = ray.point + t*ray.slope``.
+index
+    Index of the line segment in the list the scene was built from.
+"""
+
+class SegmentGrid():
+    """Static scene index: line segments binned into a uniform grid.
+
+    Each line segment is listed in every grid cell its bounding box
+    overlaps. A ray walks the cells it passes through, nearest cell
+    first, and stops at the first cell that contains a hit.
+
+    Example
+    -------
+    A box of four walls around the origin.
+    >>> from pygstuff.geometry import LineSegment
+    >>> walls = [
+    ...     LineSegment([Point(-1,-1), Point( 1,-1)]), # bottom
+    ...     LineSegment([Point( 1,-1), Point( 1, 1)]), # right
+    ...     LineSegment([Point( 1, 1), Point(-1, 1)]), # top
+    ...     LineSegment([Point(-1, 1), Point(-1,-1)]), # left
+    ...     ]
+    >>> grid = SegmentGrid(walls)
+
+    A ray from the origin going right hits the right wall:
+    >>> grid.first_hit(Line(slope=(1,0)))
+    Hit(point=Point(x=1.0, y=0.0), t=1.0, index=1)
+
+    A ray from outside the box going away from it hits nothing:
+    >>> print(grid.first_hit(Line(point=Point(5,0), slope=(1,0))))
+    None
+
+    Cast many rays at once:
+    >>> hits = grid.first_hits([(0,0), (0,0)], [(0,2), (-1,0)])
+    >>> hits.index.tolist()
+    [2, 3]
+    >>> hits.t.tolist()
+    [0.5, 1.0]
+
+    The grid finds the same hits as testing every ray against every
+    wall:
+    >>> rng = np.random.default_rng(0)
+    >>> a = rng.uniform(-50, 50, (500,2))
+    >>> b = a + rng.uniform(-5, 5, (500,2))
+    >>> walls = [LineSegment([Point(*p), Point(*q)]) for p,q in zip(a,b)]
+    >>> origins = rng.uniform(-50, 50, (200,2))
+    >>> slopes = rng.normal(size=(200,2))
+    >>> hits = SegmentGrid(walls).first_hits(origins, slopes)
+    >>> brute = meet_arrays(origins, slopes, a, b, ray=True)
+    >>> t = np.where(brute.valid, brute.t, np.inf).min(axis=1)
+    >>> bool(np.allclose(hits.t, np.where(np.isinf(t), np.nan, t), equal_nan=True))
+    True
+
+    Parameters
+    ----------
+    linesegs
+        List of LineSegment. The scene.
+    cell_size
+        Width and height of a grid cell in drawing units. Default
+        picks a size that puts about one line segment in each cell.
+
+    Notes
+    -----
+    The scene is static. If the line segments move, call
+    :meth:`refit` (same grid, cheaper) or :meth:`rebuild` (new
+    grid bounds and cell size).
+    """
+
+    def __init__(self, linesegs:list, cell_size:float = None):
+        self.rebuild(linesegs, cell_size)
+
+    def rebuild(self, linesegs:list, cell_size:float = None) -> None:
+        """Rebuild the grid from scratch for this list of line segments.
+
+        Recomputes the grid bounds and cell size, then bins the line
+        segments.
+        """
+        starts, ends = _endpoint_arrays(linesegs)
+        if len(starts) == 0:
+            lo = np.zeros(2); hi = np.ones(2)
+        else:
+            lo = np.minimum(starts.min(axis=0), ends.min(axis=0))
+            hi = np.maximum(starts.max(axis=0), ends.max(axis=0))
+        # Pad so that segments on the boundary are strictly inside.
+        pad = 1e-9*max(1.0, float(np.abs(np.concatenate((lo,hi))).max()))
+        lo = lo - pad; hi = hi + pad
+        extent = hi - lo
+        if cell_size is None:
+            # About one segment per cell.
+            n = max(len(starts), 1)
+            cell_size = math.sqrt(extent[0]*extent[1]/n)
+            cell_size = max(cell_size, extent.max()/1024)
+        self.origin = lo
+        self.cell_size = float(cell_size)
+        self.shape = tuple(
+            int(k) for k in np.maximum(np.ceil(extent/self.cell_size), 1)
+            )
+        self._bin(starts, ends)
+
+    def refit(self, linesegs:list) -> None:
+        """Re-bin moved line segments, keeping the grid.
+
+        Cheaper than :meth:`rebuild` because the bounds and cell size
+        stay the same. Falls back to :meth:`rebuild` if a line
+        segment moved outside the grid.
+        """
+        starts, ends = _endpoint_arrays(linesegs)
+        hi = self.origin + self.cell_size*np.array(self.shape)
+        inside = (
+            len(starts) == 0
+            or
+            (np.all(np.minimum(starts, ends) >= self.origin)
+             and np.all(np.maximum(starts, ends) < hi))
+            )
+        if inside:
+            self._bin(starts, ends)
+        else:
+            self.rebuild(linesegs, self.cell_size)
+
+    def _bin(self, starts:np.ndarray, ends:np.ndarray) -> None:
+        """List each line segment in every cell its bounding box overlaps.
+
+        The cell lists are stored flat (compressed sparse row):
+        the segments in cell ``c`` are
+        ``_items[_cell_start[c]:_cell_start[c+1]]``.
+        """
+        self.starts = starts
+        self.ends = ends
+        nx, ny = self.shape
+        c0 = self._cell_of(np.minimum(starts, ends))
+        c1 = self._cell_of(np.maximum(starts, ends))
+        spans = c1 - c0 + 1
+        counts = spans[:,0]*spans[:,1]
+        seg = np.repeat(np.arange(len(starts)), counts)
+        # k-th cell of each segment's bounding box, row-major
+        k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        w = spans[seg,0]
+        ix = c0[seg,0] + k % w
+        iy = c0[seg,1] + k // w
+        cell = iy*nx + ix
+        order = np.argsort(cell, kind='stable')
+        self._items = seg[order]
+        self._cell_start = np.searchsorted(cell[order], np.arange(nx*ny + 1))
+
+    def _cell_of(self, points:np.ndarray) -> np.ndarray:
+        """Return the (ix,iy) cell index of each point, clamped to the grid."""
+        c = np.floor((points - self.origin)/self.cell_size).astype(np.int64)
+        return np.clip(c, 0, np.array(self.shape) - 1)
+
+    def first_hit(self, ray:Line) -> Hit:
+        """Return the first line segment the ray hits.
+
+        Parameters
+        ----------
+        ray
+            A Line. The ray starts at ``ray.point`` and goes in the
+            direction of ``ray.slope``.
+
+        Return
+        ------
+        Hit
+            The hit point, the distance along the ray, and the index
+            of the line segment. None if the ray hits nothing.
+        """
+        hits = self.first_hits([ray.point], [ray.slope])
+        if hits.index[0] < 0:
+            return None
+        return Hit(Point(*hits.point.xy[0].tolist()), float(hits.t[0]), int(hits.index[0]))
+
+    def first_hits(self, origins, slopes, exclude=None) -> object:
+        """Return the first line segment each ray hits.
+
+        All the rays walk the grid together: each step moves every
+        ray that has not found its hit yet one cell along, and tests
+        it against the line segments in its new cell, with array
+        operations for all the rays at once.
+
+        Parameters
+        ----------
+        origins, slopes
+            N×2 arrays (or PointArrays). Ray ``i`` starts at
+            ``origins[i]`` and goes in the direction ``slopes[i]``.
+        exclude
+            Optional length-N array of segment indices. Ray ``i``
+            ignores segment ``exclude[i]`` (-1 ignores nothing). Use
+            this for a ray that starts on a segment, e.g., a
+            reflection.
+
+        Return
+        ------
+        object
+            A :class:`Hit` of arrays: ``point`` is a PointArray, ``t``
+            and ``index`` are length-N arrays. Rays that hit nothing
+            have NaN for ``point`` and ``t`` and -1 for ``index``.
+        """
+        origins = _as_xy(origins).reshape(-1, 2)
+        slopes = _as_xy(slopes).reshape(-1, 2)
+        n = len(origins)
+        t = np.full(n, np.inf)
+        index = np.full(n, -1, dtype=np.int64)
+        if exclude is None:
+            exclude = np.full(n, -1)
+        if n and len(self._items):
+            self._walk(origins, slopes, np.asarray(exclude), t, index)
+        t[index < 0] = np.nan
+        points = origins + t[:,np.newaxis]*slopes
+        return Hit(PointArray(points), t, index)
+
+    def _walk(self, P, D, exclude, best_t, best) -> None:
+        """Walk all the rays through the grid cells (Amanatides–Woo).
+
+        Write the t and index of each ray's nearest hit into `best_t`
+        and `best`.
+        """
+        hi = self.origin + self.cell_size*np.array(self.shape)
+        # Clip the rays to the grid bounds (slab test).
+        moving = D != 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ta = (self.origin - P)/D
+            tb = (hi - P)/D
+        t_enter = np.maximum(0, np.where(moving, np.minimum(ta, tb), -np.inf).max(axis=1))
+        t_leave = np.where(moving, np.maximum(ta, tb), np.inf).min(axis=1)
+        inside = (self.origin <= P) & (P <= hi)
+        a = np.flatnonzero(
+            moving.any(axis=1) & (moving | inside).all(axis=1) & (t_enter <= t_leave)
+            )
+        if len(a) == 0:
+            return
+        P = P[a]; D = D[a]; t_leave = t_leave[a]; exclude = exclude[a]
+
+        # Cell where each ray enters the grid.
+        cell = self._cell_of(P + t_enter[a,np.newaxis]*D)
+        step = np.where(D > 0, 1, -1)
+        # t at the next cell boundary crossing, and t per cell, per axis
+        boundary = self.origin + self.cell_size*(cell + (step > 0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_next = np.where(D != 0, (boundary - P)/D, np.inf)
+            t_delta = np.where(D != 0, self.cell_size/np.abs(D), np.inf)
+
+        nx, ny = self.shape
+        found_t = np.full(len(a), np.inf)
+        found = np.full(len(a), -1, dtype=np.int64)
+        r = np.arange(len(a)) # the rays still walking
+        while len(r):
+            # Every (ray, candidate segment) pair of the current cells
+            c = cell[r,1]*nx + cell[r,0]
+            first = self._cell_start[c]
+            counts = self._cell_start[c+1] - first
+            ray = np.repeat(r, counts)
+            k = np.arange(len(ray)) - np.repeat(np.cumsum(counts) - counts, counts)
+            seg = self._items[np.repeat(first, counts) + k]
+            t = _ray_segment_t(P[ray], D[ray], self.starts[seg], self.ends[seg])
+            t[seg == exclude[ray]] = np.inf
+            # Nearest candidate in the cell, the first one on a tie
+            cell_t = np.full(len(a), np.inf)
+            np.minimum.at(cell_t, ray, t)
+            nearest = np.flatnonzero((t == cell_t[ray]) & (t < np.inf))
+            rays, i = np.unique(ray[nearest], return_index=True)
+            better = cell_t[rays] < found_t[rays]
+            found_t[rays[better]] = cell_t[rays[better]]
+            found[rays[better]] = seg[nearest[i[better]]]
+
+            t_exit = t_next[r].min(axis=1)
+            # A hit before this cell's exit cannot be beaten by later cells.
+            done = (found_t[r] <= t_exit) | (t_exit > t_leave[r])
+            axis = (t_next[r,0] >= t_next[r,1]).astype(np.int64)
+            cell[r,axis] += step[r,axis]
+            t_next[r,axis] += t_delta[r,axis]
+            off_grid = ((cell[r] < 0) | (cell[r] >= self.shape)).any(axis=1)
+            r = r[~(done | off_grid)]
+        best_t[a] = found_t
+        best[a] = found
+
+def _ray_segment_t(P, D, starts, ends) -> np.ndarray:
+    """Return t where ray i meets line segment i, or inf if it misses.
+
+    The pairwise version of :func:`~pygstuff.geometry.meet_arrays`
+    (ray=True), with the same arithmetic.
+    """
+    E = ends - starts
+    W = starts - P
+    det = D[:,0]*E[:,1] - D[:,1]*E[:,0]
+    parallel = det == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inv = np.where(parallel, np.nan, 1/np.where(parallel, 1, det))
+        t = (W[:,0]*E[:,1] - W[:,1]*E[:,0])*inv
+        u = (W[:,0]*D[:,1] - W[:,1]*D[:,0])*inv
+    valid = ~parallel & (u >= 0) & (u <= 1) & (t >= 0)
+    return np.where(valid, t, np.inf)
+
+def _endpoint_arrays(linesegs:list) -> tuple:
+    """Return the first and second endpoints of the line segments as S×2 arrays."""
+    if len(linesegs) == 0:
+        return np.zeros((0,2)), np.zeros((0,2))
+    ends = PointArray.from_linesegs(linesegs).xy
+    return ends[0::2].copy(), ends[1::2].copy()
+
+def nearest_hits(origins, slopes, starts, ends, exclude=None, chunk:int = 1<<20) -> Hit:
+    """Return the first line segment each ray hits, by brute force.
+
+    Every ray is tested against every line segment with
+    :func:`~pygstuff.geometry.meet_arrays`, then the nearest hit is
+    kept. The rays are processed in blocks of about `chunk` ray-segment
+    pairs so memory stays bounded. Same output as
+    :meth:`SegmentGrid.first_hits`; faster when there are only a few
+    hundred segments.
+
+    Example
+    -------
+    >>> hits = nearest_hits([(0,0),(0,0)], [(1,0),(-1,0)], [(2,-1),(3,-1)], [(2,1),(3,1)])
+    >>> hits.index.tolist()
+    [0, -1]
+    >>> hits.t.tolist()
+    [2.0, nan]
+    """
+    origins = _as_xy(origins).reshape(-1, 2)
+    slopes = _as_xy(slopes).reshape(-1, 2)
+    starts = _as_xy(starts).reshape(-1, 2)
+    ends = _as_xy(ends).reshape(-1, 2)
+    n = len(origins)
+    t = np.full(n, np.nan)
+    index = np.full(n, -1, dtype=np.int64)
+    if len(starts):
+        rows = max(1, chunk//len(starts))
+        for i in range(0, n, rows):
+            hits = meet_arrays(origins[i:i+rows], slopes[i:i+rows], starts, ends, ray=True)
+            valid = hits.valid
+            if exclude is not None:
+                valid = valid & (np.arange(len(starts)) != np.asarray(exclude)[i:i+rows,np.newaxis])
+            tt = np.where(valid, hits.t, np.inf)
+            k = np.argmin(tt, axis=1)
+            tk = tt[np.arange(len(k)), k]
+            hit = np.isfinite(tk)
+            t[i:i+rows][hit] = tk[hit]
+            index[i:i+rows][hit] = k[hit]
+    points = origins + t[:,np.newaxis]*slopes
+    return Hit(PointArray(points), t, index)
+
+# ----------------------
+# | Multi-bounce tracer |
+# ----------------------
+
+def fan(n:int, start:float = 0, stop:float = 360) -> np.ndarray:
+    """Return the slopes of `n` rays fanned out from `start` to `stop` degrees.
+
+    A full circle (360°) does not repeat the first ray at the end.
+
+    Example
+    -------
+    >>> fan(4).round(12).tolist()
+    [[1.0, 0.0], [0.0, 1.0], [-1.0, 0.0], [-0.0, -1.0]]
+    >>> fan(3, -45, 45).round(3).tolist()
+    [[0.707, -0.707], [1.0, 0.0], [0.707, 0.707]]
+    """
+    full = (stop - start) % 360 == 0 and stop != start
+    angles = np.radians(np.linspace(start, stop, n, endpoint=not full))
+    return np.column_stack((np.cos(angles), np.sin(angles)))
+
+def reflect(slopes, starts, ends) -> np.ndarray:
+    """Reflect each ray direction off the line through each segment.
+
+    ``slopes[i]`` reflects off segment ``starts[i]``--``ends[i]``.
+    No square roots: the mirror normal is not normalized.
+
+    Example
+    -------
+    >>> reflect([(1,-1)], [(0,0)], [(5,0)]).tolist()
+    [[1.0, 1.0]]
+    """
+    D = _as_xy(slopes).reshape(-1, 2)
+    E = _as_xy(ends).reshape(-1, 2) - _as_xy(starts).reshape(-1, 2)
+    N = np.column_stack((-E[:,1], E[:,0]))        # normal to the segment
+    k = 2*np.einsum('ij,ij->i', D, N)/np.einsum('ij,ij->i', N, N)
+    return D - k[:,np.newaxis]*N
+
+class Tracer():
+    """Cast rays into a scene and bounce them off the walls.
+
+    Every bounce is done for all rays at once: one nearest-hit query
+    for the whole batch, then one vectorized reflection.
+
+    Example
+    -------
+    A box of four mirrors around the origin.
+    >>> from pygstuff.geometry import LineSegment
+    >>> walls = [
+    ...     LineSegment([Point(-2,-1), Point( 2,-1)]),
+    ...     LineSegment([Point( 2,-1), Point( 2, 1)]),
+    ...     LineSegment([Point( 2, 1), Point(-2, 1)]),
+    ...     LineSegment([Point(-2, 1), Point(-2,-1)]),
+    ...     ]
+    >>> tracer = Tracer(walls, bounces=2)
+
+    One ray at 45°. It hits the top wall, bounces to the right wall,
+    then bounces once more.
+    >>> paths = tracer.trace(Point(0,0), 1, start=45, stop=45)
+    >>> [(round(p.x,9), round(p.y,9)) for p in paths[0]]
+    [(0.0, 0.0), (1.0, 1.0), (2.0, 0.0), (1.0, -1.0)]
+
+    A fan of 8 rays gives 8 polylines of 1 + 1 + bounces points:
+    >>> paths = tracer.trace(Point(0,0), 8)
+    >>> len(paths), {len(p) for p in paths}
+    (8, {4})
+
+    Rays that escape the scene are drawn out to ``escape`` drawing
+    units:
+    >>> Tracer([], escape=10).trace(Point(0,0), 1)
+    [[Point(x=0.0, y=0.0), Point(x=10.0, y=0.0)]]
+
+    Parameters
+    ----------
+    linesegs
+        List of LineSegment (or a SegmentStore). The mirrors.
+    bounces
+        Maximum number of reflections per ray.
+    escape
+        Length to draw a ray that hits nothing.
+    grid
+        If True, find hits with a :class:`SegmentGrid`. Faster for
+        scenes with hundreds of walls or more. Default (None) uses
+        the grid when there are more than 500 walls, about where it
+        starts to beat testing every wall (from 300 walls with a
+        thousand rays, to 1000 walls with ten rays).
+    """
+
+    def __init__(self,
+            linesegs:list,
+            bounces:int = 1,
+            escape:float = 1000.0,
+            grid:bool = None
+            ):
+        self.bounces = bounces
+        self.escape = escape
+        self.set_walls(linesegs, grid)
+
+    def set_walls(self, linesegs:list, grid:bool = None) -> None:
+        """Replace the walls, e.g., when the scene changes."""
+        self.starts, self.ends = _endpoint_arrays(linesegs)
+        if grid is None:
+            grid = len(self.starts) > 500
+        self.grid = SegmentGrid(linesegs) if grid else None
+
+    def _first_hits(self, origins, slopes, exclude) -> Hit:
+        if self.grid is not None:
+            return self.grid.first_hits(origins, slopes, exclude)
+        return nearest_hits(origins, slopes, self.starts, self.ends, exclude)
+
+    def trace_arrays(self, origins, slopes) -> np.ndarray:
+        """Trace rays given as arrays. Return the path vertices.
+
+        Parameters
+        ----------
+        origins, slopes
+            N×2 arrays. Ray ``i`` starts at ``origins[i]`` and goes in
+            the direction ``slopes[i]``.
+
+        Return
+        ------
+        numpy.ndarray
+            (bounces+2)×N×2 array. ``vertices[:,i]`` is the path of
+            ray ``i``: its origin, each hit point, and finally the
+            point where it escapes. Once a ray escapes, the rest of
+            its path is NaN.
+        """
+        P = _as_xy(origins).reshape(-1, 2).copy()
+        D = _as_xy(slopes).reshape(-1, 2).copy()
+        n = len(P)
+        vertices = np.full((self.bounces + 2, n, 2), np.nan)
+        vertices[0] = P
+        alive = np.arange(n)
+        exclude = np.full(n, -1)
+        for b in range(self.bounces + 1):
+            if len(alive) == 0:
+                break
+            hits = self._first_hits(P, D, exclude)
+            hit = hits.index >= 0
+            # Rays that hit nothing escape
+            escaped = ~hit
+            if escaped.any():
+                d = D[escaped]
+                d = d/np.hypot(d[:,0], d[:,1])[:,np.newaxis]
+                vertices[b+1, alive[escaped]] = P[escaped] + self.escape*d
+            # The last bounce only records where the ray lands
+            vertices[b+1, alive[hit]] = hits.point.xy[hit]
+            if b == self.bounces:
+                break
+            index = hits.index[hit]
+            D = reflect(D[hit], self.starts[index], self.ends[index])
+            P = hits.point.xy[hit]
+            exclude = index
+            alive = alive[hit]
+        return vertices
+
+    def trace(self,
+            source:Point,
+            n:int,
+            start:float = 0,
+            stop:float = 360
+            ) -> list:
+        """Cast a fan of `n` rays from `source` and trace their bounces.
+
+        The rays are spread evenly from angle `start` to angle `stop`
+        (degrees). See :func:`fan`.
+
+        Return
+        ------
+        list
+            One polyline (a list of Point) per ray, ready for
+            :func:`pygstuff.draw_geometry.draw_connect_points`.
+        """
+        slopes = fan(n, start, stop)
+        origins = np.broadcast_to(_as_xy(source), slopes.shape)
+        return polylines(self.trace_arrays(origins, slopes))
+
+def polylines(vertices:np.ndarray) -> list:
+    """Convert :meth:`Tracer.trace_arrays` output to lists of Points.
+
+    The NaN padding at the end of each path is dropped.
+    """
+    paths = []
+    for path in np.swapaxes(vertices, 0, 1).tolist():
+        paths.append([Point(x,y) for x,y in path if x == x])
+    return paths
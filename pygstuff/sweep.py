@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Find every crossing among many line segments with a sweep line.
+
+Like :mod:`pygstuff.geometry`, this has nothing to do with pygame.
+
+Testing every pair of line segments with
+:meth:`~pygstuff.geometry.Line.meet` is O(n²). The Bentley–Ottmann
+sweep line only tests segments that are neighbors along the sweep
+line, so it is O((n+k) log n) for n segments and k crossings.
+
+The algorithm follows de Berg et al., *Computational Geometry*,
+chapter 2, turned sideways: the sweep line is vertical and moves in
+the +x direction. Vertical segments play the part of the horizontal
+segments in the book.
+
+Notes
+-----
+The sweep line status is a plain Python list kept in order with a
+binary search. Insertion into a list is O(n) in principle, but it is a
+C memmove and it is cheap next to the O(log n) Python-level
+comparisons.
+"""
+
+from collections import namedtuple
+from fractions import Fraction
+import heapq
+from .geometry import Point, SegmentStore, _ratio
+
+Crossing = namedtuple('Crossing', ['point', 'segments'])
+Crossing.__doc__ = """A point where two or more line segments meet.
+
+point
+    The Point where the line segments meet.
+segments
+    Tuple of the indices of the line segments that meet at ``point``,
+    in ascending order.
+"""
+
+def find_intersections(linesegs:list, eps:float = None) -> list:
+    """Return every point where two or more line segments meet.
+
+    Crossings, T-junctions (an endpoint touching another segment) and
+    shared endpoints all count. Collinear segments that overlap meet
+    at the two ends of the overlap.
+
+    Example
+    -------
+    >>> from pygstuff.geometry import LineSegment
+    >>> segs = [
+    ...     LineSegment([Point(0,0), Point(4,4)]),
+    ...     LineSegment([Point(0,4), Point(4,0)]),
+    ...     LineSegment([Point(1,-1), Point(1,5)]),  # vertical
+    ...     LineSegment([Point(5,5), Point(6,6)]),   # meets nothing
+    ...     ]
+    >>> for c in find_intersections(segs): print(c)
+    Crossing(point=Point(x=1, y=1), segments=(0, 2))
+    Crossing(point=Point(x=1, y=3), segments=(1, 2))
+    Crossing(point=Point(x=2, y=2), segments=(0, 1))
+
+    Integer and Fraction coordinates give exact points:
+    >>> segs = [
+    ...     LineSegment([Point(0,0), Point(3,1)]),
+    ...     LineSegment([Point(0,1), Point(3,0)]),
+    ...     ]
+    >>> find_intersections(segs)
+    [Crossing(point=Point(x=Fraction(3, 2), y=Fraction(1, 2)), segments=(0, 1))]
+
+    Collinear overlapping segments meet at the ends of the overlap:
+    >>> segs = [
+    ...     LineSegment([Point(0,0), Point(4,0)]),
+    ...     LineSegment([Point(2,0), Point(6,0)]),
+    ...     ]
+    >>> [tuple(c.point) for c in find_intersections(segs)]
+    [(2, 0), (4, 0)]
+
+    Same pairs as testing every pair:
+    >>> import numpy as np
+    >>> from pygstuff.geometry import meet_arrays
+    >>> rng = np.random.default_rng(3)
+    >>> A = rng.uniform(0, 1, (80,2)); B = rng.uniform(0, 1, (80,2))
+    >>> segs = SegmentStore.from_arrays(A, B)
+    >>> found = {c.segments for c in find_intersections(segs)}
+    >>> h = meet_arrays(A, B - A, A, B)
+    >>> hit = np.triu(h.valid & (h.t >= 0) & (h.t <= 1), 1)
+    >>> found == {(int(i), int(j)) for i, j in zip(*np.nonzero(hit))}
+    True
+
+    Parameters
+    ----------
+    linesegs
+        List of LineSegment (or a SegmentStore).
+    eps
+        Distance below which two points are the same point. Default
+        is 0 for int and Fraction coordinates (exact arithmetic) and
+        a tiny fraction of the scene size for floats.
+
+    Return
+    ------
+    list
+        List of :class:`Crossing`, in sweep order (by x, then y).
+    """
+    segs = _segment_tuples(linesegs)
+    if eps is None:
+        coords = [c for seg in segs for p in seg for c in p]
+        if all(isinstance(c, (int, Fraction)) for c in coords):
+            eps = 0
+        else:
+            eps = 1e-9*max([1.0] + [abs(float(c)) for c in coords])
+    return _Sweep(segs, eps).run()
+
+def _segment_tuples(linesegs) -> list:
+    """Return each segment as ((x,y), (x,y)), left endpoint first.
+
+    Left means lexicographically smaller: smaller x, or for a vertical
+    segment, smaller y.
+    """
+    if isinstance(linesegs, SegmentStore):
+        pairs = linesegs.endpoints.tolist()
+    else:
+        pairs = [[tuple(p) for p in l.endpoints] for l in linesegs]
+    return [tuple(sorted((tuple(a), tuple(b)))) for a, b in pairs]
+
+class _Sweep():
+    """State of one run of the sweep line algorithm."""
+
+    def __init__(self, segs:list, eps:float):
+        self.segs = segs
+        self.eps = eps
+        # Event queue: heap of points, plus the segments whose left
+        # endpoint is at each point (U(p) in the book).
+        self.queue = []
+        self.upper = {}
+        for i, (left, right) in enumerate(segs):
+            self._push(left)
+            self.upper[left].append(i)
+            self._push(right)
+        self.status = [] # segment indices, ordered by y along the sweep line
+        self.p = None
+        self.found = []
+
+    def _push(self, q) -> None:
+        if q not in self.upper:
+            self.upper[q] = []
+            heapq.heappush(self.queue, q)
+
+    def run(self) -> list:
+        while self.queue:
+            p = heapq.heappop(self.queue)
+            U = self.upper.pop(p)
+            # Merge events that are the same point within eps.
+            while self.queue and self._same(self.queue[0], p):
+                U += self.upper.pop(heapq.heappop(self.queue))
+            self._handle(p, U)
+        return self.found
+
+    def _same(self, a, b) -> bool:
+        return abs(a[0] - b[0]) <= self.eps and abs(a[1] - b[1]) <= self.eps
+
+    def _y_at(self, i:int) -> float:
+        """y where segment i crosses the sweep line at the current event."""
+        (x0, y0), (x1, y1) = self.segs[i]
+        x, y = self.p
+        if x1 == x0:
+            # A vertical segment is everywhere on it at once: it is at
+            # the event y if the event is on it.
+            return min(max(y, y0), y1)
+        if x <= x0: return y0
+        if x >= x1: return y1
+        return y0 + _ratio((x - x0)*(y1 - y0), x1 - x0)
+
+    def _slope_key(self, i:int) -> tuple:
+        """Order of segments that meet at the event, just past the event."""
+        (x0, y0), (x1, y1) = self.segs[i]
+        if x1 == x0:
+            return (1, 0, i) # vertical goes last
+        return (0, _ratio(y1 - y0, x1 - x0), i)
+
+    def _handle(self, p, U:list) -> None:
+        self.p = p
+        x, y = p
+        status = self.status
+        # Find the segments on the sweep line that contain p. They are
+        # next to each other in the status.
+        lo = 0; hi = len(status)
+        while lo < hi:
+            mid = (lo + hi)//2
+            if self._y_at(status[mid]) < y - self.eps:
+                lo = mid + 1
+            else:
+                hi = mid
+        hi = lo
+        while hi < len(status) and self._y_at(status[hi]) <= y + self.eps:
+            hi += 1
+        containing = status[lo:hi]
+
+        involved = set(U) | set(containing)
+        if len(involved) > 1:
+            self.found.append(Crossing(Point(x, y), tuple(sorted(involved))))
+
+        # Segments that end at p leave the status. Segments that pass
+        # through p are re-inserted in their order just past p.
+        C = [i for i in containing if not self._same(self.segs[i][1], p)]
+        UC = [i for i in U if self.segs[i][0] != self.segs[i][1]] + C
+        UC.sort(key=self._slope_key)
+        status[lo:hi] = UC
+
+        if not UC:
+            if 0 < lo < len(status):
+                self._find_event(status[lo-1], status[lo])
+        else:
+            if lo > 0:
+                self._find_event(status[lo-1], status[lo])
+            top = lo + len(UC) - 1
+            if top + 1 < len(status):
+                self._find_event(status[top], status[top+1])
+
+    def _find_event(self, a:int, b:int) -> None:
+        """Queue the crossing of segments a and b if it is past the sweep line."""
+        (ax, ay), (bx, by) = self.segs[a]
+        (cx, cy), (dx, dy) = self.segs[b]
+        rx = bx - ax; ry = by - ay
+        sx = dx - cx; sy = dy - cy
+        denom = rx*sy - ry*sx
+        if denom == 0:
+            # Parallel. Collinear overlaps are found at the endpoints.
+            return
+        wx = cx - ax; wy = cy - ay
+        t = _ratio(wx*sy - wy*sx, denom)
+        u = _ratio(wx*ry - wy*rx, denom)
+        if not (0 <= t <= 1 and 0 <= u <= 1):
+            return
+        q = (_simplify(ax + t*rx), _simplify(ay + t*ry))
+        if q > self.p and not self._same(q, self.p):
+            self._push(q)
+
+def _simplify(v):
+    """Return a whole-number Fraction as an int."""
+    if isinstance(v, Fraction) and v.denominator == 1:
+        return v.numerator
+    return v
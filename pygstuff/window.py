@@ -21,19 +21,62 @@ class Window(object):
     >>> win.open_window(400,100)
     >>> import time
     >>> time.sleep(0.5) # window visible for 0.5 seconds
+
+    Dirty rectangles
+    ----------------
+    By default, update() flips the whole display. Call track_dirty()
+    to only push the parts of the screen that changed. The draw
+    functions in pygs.draw_geometry report what they draw with
+    mark_dirty(). Erase last frame's drawing with clear() instead of
+    filling the whole surface.
+
+    >>> win.track_dirty()
+    >>> win.clear((0,0,0))
+    >>> r = pygame.draw.line(win.surface, (255,255,255), (10,10), (20,20))
+    >>> win.mark_dirty(r)
+    >>> win.update() # first frame is always a full flip
+    True
+    >>> win.clear((0,0,0))
+    >>> r = pygame.draw.line(win.surface, (255,255,255), (10,12), (20,22))
+    >>> win.mark_dirty(r)
+    >>> win.update() # only the old and new line are pushed
+    False
+
+    Headless
+    --------
+    On a server with no display, make a headless window. It draws on
+    a plain pygame Surface and update() shows nothing. Save the
+    frames with pygs.FrameExporter.
+
+    >>> win = pygs.Window(headless=True)
+    >>> win.open_window(320, 200)
+    >>> win.surface.get_size()
+    (320, 200)
+    >>> win.update()
+    True
     '''
-    def __init__(self, caption='Me game', icon=None):
+
+    # Dirty rectangle tracker, None when update() flips the whole display
+    dirty = None
+    def __init__(self, caption='Me game', icon=None, headless=False):
         '''Window configuration.
 
         - calls pygame.init()
         - sets OS environment variable to center the window
         - sets the window caption (default is 'Me game')
         - sets the window icon (default is the Pygame logo)
+        - if headless is True, no window is ever shown: the SDL video
+          driver defaults to 'dummy' and open_window() makes an
+          off-screen Surface
         
         TODO
         ----
         add full-screen
         '''
+        self.headless = headless
+        if headless:
+            # Events and timers still work, without a display
+            os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
         os.environ['SDL_VIDEO_CENTERED'] = '1' # do before pygame.init()
         pygame.init()
         pygame.display.set_caption(caption) # window title
@@ -57,13 +100,112 @@ class Window(object):
         '''
         self.width = width
         self.height = height
-        self.surface = pygame.display.set_mode(
-            # size=(self.width, self.height),
-            (self.width, self.height),
-            # flags=0,
-            # depth=0,
-            # display=0,
-            ) # -> Surface
+        if self.headless:
+            self.surface = pygame.Surface((self.width, self.height))
+        else:
+            self.surface = pygame.display.set_mode(
+                # size=(self.width, self.height),
+                (self.width, self.height),
+                # flags=0,
+                # depth=0,
+                # display=0,
+                ) # -> Surface
+        if self.dirty is not None:
+            self.track_dirty(self.dirty.threshold, self.dirty.max_rects)
+
+    def track_dirty(self, threshold=0.5, max_rects=100):
+        '''Switch update() to dirty rectangle mode.
+
+        Parameters
+        ----------
+        threshold: fall back to a full flip when the dirty rectangles
+            cover more than this fraction of the window
+        max_rects: merge the dirty rectangles into their bounding box
+            when there are more than this many
+        '''
+        self.dirty = DirtyRects(
+            (self.width, self.height), threshold, max_rects
+            )
+
+    def untrack_dirty(self):
+        '''Switch update() back to flipping the whole display.'''
+        self.dirty = None
+
+    def mark_dirty(self, rect):
+        '''Record that `rect` (a pygame.Rect) was drawn this frame.
+
+        Does nothing unless track_dirty() was called.
+        '''
+        if self.dirty is not None:
+            self.dirty.add(rect)
+
+    def clear(self, rgb):
+        '''Erase the window to color `rgb`.
+
+        In dirty rectangle mode, only erase what was drawn last frame.
+        '''
+        if self.dirty is None or self.dirty.full:
+            self.surface.fill(rgb)
+        else:
+            self.dirty.erase(self.surface, rgb)
+
+    def update(self):
+        '''Show this frame: the replacement for pygame.display.flip().
+
+        Return True if the whole display was flipped, False if only
+        the dirty rectangles were updated. A headless window has no
+        display: nothing is shown and update() returns True.
+        '''
+        if self.dirty is None:
+            if not self.headless:
+                pygame.display.flip()
+            return True
+        return self.dirty.update(show=not self.headless)
+
+class DirtyRects(object):
+    '''The parts of the screen drawn this frame and last frame.
+
+    A pixel needs to be pushed to the display if it was drawn this
+    frame, or if it was drawn last frame (it has since been erased).
+    '''
+    def __init__(self, size, threshold=0.5, max_rects=100):
+        self.size = size
+        self.threshold = threshold
+        self.max_rects = max_rects
+        self.current = []
+        self.previous = []
+        self.full = True # first frame: everything is new
+
+    def add(self, rect):
+        if rect.width and rect.height:
+            self.current.append(pygame.Rect(rect))
+
+    def erase(self, surface, rgb):
+        for rect in self.previous:
+            surface.fill(rgb, rect)
+
+    def update(self, show=True):
+        '''Push the dirty rectangles (or flip). Start the next frame.
+
+        With show=False, only start the next frame.
+        '''
+        rects = self.previous + self.current
+        if len(rects) > self.max_rects:
+            rects = [rects[0].unionall(rects[1:])]
+        screen = pygame.Rect((0, 0), self.size)
+        area = sum(r.clip(screen).width*r.clip(screen).height for r in rects)
+        full = self.full or area > self.threshold*screen.width*screen.height
+        if show and full:
+            pygame.display.flip()
+        elif show and rects:
+            pygame.display.update(rects)
+        # This frame's drawing is next frame's erasing.
+        self.previous = self.current
+        if len(self.previous) > self.max_rects:
+            self.previous = [self.previous[0].unionall(self.previous[1:])]
+        self.current = []
+        self.full = False
+        return full
 
 if __name__ == '__main__':
     import doctest
@@ -31,6 +31,7 @@ setuptools.setup(
     python_requires='>=3.7',
     install_requires=[
         "pygame",
+        "numpy",
         ],
     license='MIT', # field in *.egg-info/PKG-INFO
     platforms=['Windows', 'Mac', 'Linux'], # legacy field in *.egg-info/PKG-INFO